@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+
+'''Time the phases of a Paradocs build on a synthetic corpus.'''
+
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+
+from paradocs_lib import CppCode, XmlBackend, __version__
+from paradocs import Project
+
+import corpus
+
+PHASES = ['metadata', 'parse', 'index_render', 'class_render', 'write']
+
+
+def run_once(jobs: int, streaming: bool, outdir: str) -> dict:
+    '''Build the project in the current directory once. Return the seconds
+    of each phase.'''
+    CppCode.normalize_param.cache_clear()
+    CppCode.normalize_template.cache_clear()
+    times = {}
+
+    start = time.perf_counter()
+    project = Project('paradocs.xml')
+    project.parse_metadata()
+    project.parse_categories()
+    project.set_streaming(streaming)
+    times['metadata'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    project.parse_category_trees(None, jobs)
+    times['parse'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_out = io.StringIO()
+    project.write_index_page(index_out)
+    times['index_render'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pages = [('index.md', index_out.getvalue())]
+    for klass in project.classes():
+        out = io.StringIO()
+        project.write_class_page(klass, out)
+        pages.append((klass.filename, out.getvalue()))
+    times['class_render'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for filename, text in pages:
+        with open(os.path.join(outdir, filename), 'w') as f:
+            f.write(text)
+    times['write'] = time.perf_counter() - start
+
+    return times
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BASE_DIR, stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def print_report(result: dict, base: dict | None=None):
+    print('XML backend: ' + result['options'].get('xml_backend', 'stdlib'))
+    print(f'{"phase":<14}{"min (s)":>10}{"median (s)":>12}', end='')
+    print(f'{"base (s)":>10}{"ratio":>8}' if base is not None else '')
+    for phase in PHASES:
+        stat = result['phases'][phase]
+        print(f'{phase:<14}{stat["min"]:>10.4f}{stat["median"]:>12.4f}', end='')
+        if base is not None and phase in base['phases']:
+            base_min = base['phases'][phase]['min']
+            ratio = stat['min'] / base_min if base_min > 0 else float('inf')
+            print(f'{base_min:>10.4f}{ratio:>8.2f}')
+        else:
+            print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--corpus', metavar='DIR',
+        help='use or create the corpus in DIR instead of a temporary one')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-j', '--jobs', type=int, default=1)
+    parser.add_argument('--streaming', action='store_true')
+    parser.add_argument('--xml-backend', default=XmlBackend.STDLIB,
+        choices=[XmlBackend.STDLIB, XmlBackend.LXML, XmlBackend.AUTO])
+    parser.add_argument('--output', metavar='FILE',
+        help='save the result as JSON')
+    parser.add_argument('--compare', metavar='FILE',
+        help='compare with a result saved by --output')
+    corpus.add_arguments(parser)
+    args = parser.parse_args()
+    config = corpus.config_from_args(args)
+    try:
+        XmlBackend.use(args.xml_backend)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with tempfile.TemporaryDirectory(prefix='paradocs-bench-') as tmpdir:
+        corpus_dir = args.corpus or os.path.join(tmpdir, 'corpus')
+        if not os.path.exists(os.path.join(corpus_dir, 'paradocs.xml')):
+            print(f'Generating corpus in {corpus_dir}...')
+            corpus.CorpusGenerator(config).write(corpus_dir)
+        outdir = os.path.join(tmpdir, 'out')
+        os.makedirs(outdir, exist_ok=True)
+
+        cwd = os.getcwd()
+        os.chdir(corpus_dir)
+        try:
+            runs = [run_once(args.jobs, args.streaming, outdir)
+                for _ in range(args.repeat)]
+        finally:
+            os.chdir(cwd)
+
+    result = {
+        'paradocs': __version__,
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'corpus': config.to_dict() if args.corpus is None else args.corpus,
+        'options': {'jobs': args.jobs, 'streaming': args.streaming,
+            'xml_backend': XmlBackend.name()},
+        'phases': {},
+    }
+    for phase in PHASES:
+        values = [run[phase] for run in runs]
+        result['phases'][phase] = {
+            'min': min(values),
+            'median': statistics.median(values),
+            'runs': values,
+        }
+
+    base = None
+    if args.compare is not None:
+        with open(args.compare) as f:
+            base = json.load(f)
+    print_report(result, base)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
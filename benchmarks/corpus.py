@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+
+'''Generate a synthetic Doxygen XML corpus and a matching paradocs.xml.'''
+
+import argparse
+import os
+import random
+
+from xml.sax.saxutils import escape
+
+
+class CorpusConfig:
+    def __init__(self, classes=100, functions=10, overloads=3, nested=1,
+            template_params=2, enums=2, enum_values=20, categories=5,
+            namespace='bench', seed=0):
+        self.classes = classes
+        self.functions = functions # Distinct function names per class.
+        self.overloads = overloads # Overloads per function name.
+        self.nested = nested # Nested classes per top level class.
+        self.template_params = template_params # For every other class.
+        self.enums = enums # Per class.
+        self.enum_values = enum_values # Per enum.
+        self.categories = categories
+        self.namespace = namespace
+        self.seed = seed
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+PARAM_TYPES = [
+    'int', 'int32_t', 'bool', 'double', 'const char *',
+    'const {cls} &amp;', 'const String &amp;', 'String &amp;&amp;',
+    'std::function&lt; void(int32_t)&gt;',
+    'const std::vector&lt; std::pair&lt; int, {cls} &gt; &gt; &amp;',
+]
+RETURN_TYPES = [
+    'void', 'int', 'bool', '{cls} &amp;', 'const String &amp;',
+    'std::vector&lt; {cls} &gt;', 'std::optional&lt; std::pair&lt; int, int &gt; &gt;',
+]
+WORDS = ('the value of object string index range buffer element node '
+    'returns sets gets creates checks whether given current first last '
+    'unicode scalar code point byte offset length capacity').split()
+
+
+def compound_id(namespace, name) -> str:
+    '''Doxygen compound id. e.g. "classmy_1_1Outer_1_1Inner".'''
+    return 'class' + '_1_1'.join([namespace] + name.split('::'))
+
+
+class CorpusGenerator:
+    def __init__(self, config: CorpusConfig):
+        self._config = config
+        self._random = random.Random(config.seed)
+
+    def _sentence(self, words=8) -> str:
+        return ' '.join(self._random.choice(WORDS) for _ in range(words))
+
+    def _description(self, cls_id, cls_name, params) -> str:
+        text = '<para>'
+        text += f'<simplesect kind="since"><para>0.{self._random.randint(1, 9)} </para>\n</simplesect>\n'
+        if len(params) > 0:
+            text += '<parameterlist kind="param">'
+            for name in params:
+                text += ('<parameteritem>\n<parameternamelist>\n'
+                    f'<parametername>{name}</parametername>\n'
+                    '</parameternamelist>\n<parameterdescription>\n'
+                    f'<para>A <computeroutput><ref refid="{cls_id}" kindref="compound">'
+                    f'{cls_name}</ref></computeroutput> {self._sentence(5)}.</para>\n'
+                    '</parameterdescription>\n</parameteritem>\n')
+            text += '</parameterlist>\n'
+        text += f'{self._sentence(20)}. </para>\n'
+        text += f'<para>{self._sentence(30)} <computeroutput>{self._sentence(2)}</computeroutput> {self._sentence(10)}. </para>\n'
+        return text
+
+    def _function(self, cls_id, cls_name, index, name, overload) -> str:
+        cfg = self._config
+        relative = cls_name.rsplit('::', 1)[-1]
+        ret = self._random.choice(RETURN_TYPES).format(cls=relative)
+        params = [f'arg{i}' for i in range(overload + 1)]
+        const = 'yes' if self._random.random() < 0.3 else 'no'
+        text = (f'      <memberdef kind="function" id="{cls_id}_1f{index}" prot="public" '
+            f'static="no" const="{const}" explicit="no" inline="no" virt="non-virtual">\n')
+        if overload == 2:
+            text += ('        <templateparamlist>\n          <param>\n'
+                '            <type>typename U</type>\n          </param>\n'
+                '        </templateparamlist>\n')
+        text += f'        <type>{ret}</type>\n'
+        text += f'        <definition>{ret} {cfg.namespace}::{cls_name}::{name}</definition>\n'
+        text += '        <argsstring>()</argsstring>\n'
+        text += f'        <name>{name}</name>\n'
+        for param in params:
+            param_type = self._random.choice(PARAM_TYPES).format(cls=
+                f'<ref refid="{cls_id}" kindref="compound">{relative}</ref>')
+            text += (f'        <param>\n          <type>{param_type}</type>\n'
+                f'          <declname>{param}</declname>\n        </param>\n')
+        text += (f'        <briefdescription>\n<para>{self._sentence()}. </para>\n'
+            '        </briefdescription>\n')
+        text += ('        <detaileddescription>\n'
+            + self._description(cls_id, relative, params)
+            + '        </detaileddescription>\n')
+        text += '        <inbodydescription>\n        </inbodydescription>\n'
+        text += f'        <location file="{relative.lower()}.h" line="{index}" column="5"/>\n'
+        text += '      </memberdef>\n'
+        return text
+
+    def _enum(self, cls_id, cls_name, index) -> str:
+        cfg = self._config
+        name = f'Kind{index}'
+        text = (f'      <memberdef kind="enum" id="{cls_id}_1e{index}" prot="public" '
+            'static="no" strong="yes">\n        <type></type>\n'
+            f'        <name>{name}</name>\n'
+            f'        <qualifiedname>{cfg.namespace}::{cls_name}::{name}</qualifiedname>\n')
+        for i in range(cfg.enum_values):
+            text += (f'        <enumvalue id="{cls_id}_1e{index}v{i}" prot="public">\n'
+                f'          <name>Value{i}</name>\n'
+                f'          <briefdescription>\n<para>{self._sentence(6)}. </para>\n'
+                '          </briefdescription>\n'
+                '          <detaileddescription>\n          </detaileddescription>\n'
+                '        </enumvalue>\n')
+        text += (f'        <briefdescription>\n<para>{self._sentence()}. </para>\n'
+            '        </briefdescription>\n'
+            f'        <detaileddescription>\n<para>{self._sentence(20)}. </para>\n'
+            '        </detaileddescription>\n'
+            '        <inbodydescription>\n        </inbodydescription>\n'
+            '      </memberdef>\n')
+        return text
+
+    def _compound(self, cls_name, index, inner_names) -> str:
+        cfg = self._config
+        cls_id = compound_id(cfg.namespace, cls_name)
+        text = ("<?xml version='1.0' encoding='UTF-8' standalone='no'?>\n"
+            '<doxygen xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            'xsi:noNamespaceSchemaLocation="compound.xsd" version="1.9.6" xml:lang="en-US">\n'
+            f'  <compounddef id="{cls_id}" kind="class" language="C++" prot="public">\n'
+            f'    <compoundname>{cfg.namespace}::{cls_name}</compoundname>\n')
+        for inner in inner_names:
+            inner_id = compound_id(cfg.namespace, inner)
+            text += f'    <innerclass refid="{inner_id}" prot="public">{cfg.namespace}::{inner}</innerclass>\n'
+        if index % 2 == 1 and cfg.template_params > 0:
+            text += '    <templateparamlist>\n'
+            for i in range(cfg.template_params):
+                text += f'      <param>\n        <type>typename T{i}</type>\n      </param>\n'
+            text += '    </templateparamlist>\n'
+        text += '      <sectiondef kind="public-type">\n'
+        text += (f'      <memberdef kind="typedef" id="{cls_id}_1t" prot="public" static="no">\n'
+            '        <type>int32_t</type>\n        <name>SizeType</name>\n'
+            '        <briefdescription>\n        </briefdescription>\n'
+            '        <detaileddescription>\n        </detaileddescription>\n'
+            '      </memberdef>\n')
+        for i in range(cfg.enums):
+            text += self._enum(cls_id, cls_name, i)
+        text += '      </sectiondef>\n'
+        text += '      <sectiondef kind="public-func">\n'
+        member_index = 0
+        for i in range(cfg.functions):
+            name = f'{self._random.choice(WORDS)}_{i}'
+            for overload in range(cfg.overloads):
+                text += self._function(cls_id, cls_name, member_index, name, overload)
+                member_index += 1
+        text += '      </sectiondef>\n'
+        text += (f'    <briefdescription>\n<para>{self._sentence()} <computeroutput>'
+            f'{escape(cls_name)}</computeroutput> {self._sentence(4)}. </para>\n'
+            '    </briefdescription>\n'
+            f'    <detaileddescription>\n<para>{self._sentence(40)}. </para>\n'
+            '    </detaileddescription>\n'
+            '    <listofallmembers>\n    </listofallmembers>\n'
+            '  </compounddef>\n</doxygen>\n')
+        return text
+
+    def class_names(self):
+        '''List of (name, [nested names]) of the top level classes.'''
+        cfg = self._config
+        ret = []
+        for i in range(cfg.classes):
+            name = f'Class{i}'
+            ret.append((name, [f'{name}::Nested{j}' for j in range(cfg.nested)]))
+        return ret
+
+    def write(self, outdir):
+        '''Write <outdir>/paradocs.xml and the XML files in
+        <outdir>/doxygen/xml.'''
+        cfg = self._config
+        xmldir = os.path.join(outdir, 'doxygen', 'xml')
+        os.makedirs(xmldir, exist_ok=True)
+
+        categories = [[] for _ in range(max(1, cfg.categories))]
+        index_entries = []
+        for i, (name, nested) in enumerate(self.class_names()):
+            for j, cls_name in enumerate([name] + nested):
+                cls_id = compound_id(cfg.namespace, cls_name)
+                inner = nested if j == 0 else []
+                with open(os.path.join(xmldir, cls_id + '.xml'), 'w') as f:
+                    f.write(self._compound(cls_name, i + j, inner))
+                categories[i % len(categories)].append((cls_name, cls_id))
+                index_entries.append((cls_name, cls_id))
+
+        with open(os.path.join(xmldir, 'index.xml'), 'w') as f:
+            f.write("<?xml version='1.0' encoding='UTF-8' standalone='no'?>\n"
+                '<doxygenindex version="1.9.6" xml:lang="en-US">\n')
+            for cls_name, cls_id in index_entries:
+                f.write(f'  <compound refid="{cls_id}" kind="class">'
+                    f'<name>{cfg.namespace}::{cls_name}</name>\n')
+                for i in range(cfg.enums):
+                    f.write(f'    <member refid="{cls_id}_1e{i}" kind="enum">'
+                        f'<name>Kind{i}</name></member>\n')
+                f.write('  </compound>\n')
+            f.write(f'  <compound refid="namespace{cfg.namespace}" kind="namespace">'
+                f'<name>{cfg.namespace}</name>\n  </compound>\n')
+            f.write('</doxygenindex>\n')
+
+        with open(os.path.join(outdir, 'paradocs.xml'), 'w') as f:
+            f.write('<paradocs>\n    <project>\n'
+                '        <name>Bench</name>\n'
+                '        <description>A synthetic project for benchmarks.</description>\n'
+                '        <version>1.0</version>\n'
+                f'        <namespace>{cfg.namespace}</namespace>\n'
+                '        <docdir>doxygen/xml</docdir>\n')
+            for i, classes in enumerate(categories):
+                f.write(f'        <category>\n            <name>Category {i}</name>\n')
+                for cls_name, cls_id in classes:
+                    header = cls_name.split('::')[0].lower()
+                    f.write(f'            <class namespace="{cfg.namespace}" file="{cls_id}.xml">\n'
+                        f'                <name>{cls_name}</name>\n'
+                        f'                <include>&lt;{cfg.namespace}/{header}.h&gt;</include>\n'
+                        '            </class>\n')
+                f.write('        </category>\n')
+            f.write('    </project>\n</paradocs>\n')
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    default = CorpusConfig()
+    for key, value in default.to_dict().items():
+        option = '--' + key.replace('_', '-')
+        parser.add_argument(option, type=type(value), default=value,
+            help=f'default: {value}')
+
+
+def config_from_args(args) -> CorpusConfig:
+    keys = CorpusConfig().to_dict().keys()
+    return CorpusConfig(**{key: getattr(args, key) for key in keys})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('outdir')
+    add_arguments(parser)
+    args = parser.parse_args()
+    CorpusGenerator(config_from_args(args)).write(args.outdir)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+
+'''Check the text extraction functions against their recursive versions,
+and time both on long and deeply nested descriptions.'''
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+import xml.etree.ElementTree as ET
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+
+from paradocs_lib import Xml, DoxygenClassXml
+
+import corpus
+
+
+class Recursive:
+    '''The recursive versions the functions replaced.'''
+    @staticmethod
+    def plain_text(tree):
+        txt = tree.text or ''
+        for child in tree:
+            txt += Recursive.plain_text(child)
+            txt += child.tail or ''
+        return txt
+
+    @staticmethod
+    def plain_text_exclude(tree, exclude):
+        text = tree.text or ''
+        for child in tree:
+            if child.tag not in exclude:
+                text += Recursive.plain_text_exclude(child, exclude)
+            text += child.tail or ''
+        return text.strip()
+
+    @staticmethod
+    def find_tag(tree, name):
+        if tree.tag == name:
+            return tree
+        for child in tree:
+            found = Recursive.find_tag(child, name)
+            if found is not None:
+                return found
+        return None
+
+    @staticmethod
+    def description_text(tree):
+        text = (tree.text or '').lstrip()
+        for child in tree:
+            if child.tag == 'computeroutput':
+                text += f'`{Recursive.plain_text(child)}`'
+            else:
+                text += Recursive.description_text(child)
+            text += child.tail or ''
+        return text.strip()
+
+    @staticmethod
+    def description_text_exclude(tree, exclude):
+        text = (tree.text or '').lstrip()
+        for child in tree:
+            if child.tag not in exclude:
+                if child.tag == 'computeroutput':
+                    text += f'`{Recursive.plain_text(child)}`'
+                else:
+                    text += Recursive.description_text_exclude(child, exclude)
+            text += child.tail or ''
+        return text.strip()
+
+
+EXCLUDE = ('parameterlist', 'simplesect', 'ref')
+FIND_NAMES = ('para', 'ref', 'computeroutput', 'parametername', 'missing')
+
+
+def check_element(elem) -> int:
+    '''Compare the functions on the element. Return the number of
+    comparisons.'''
+    pairs = [
+        (Xml.plain_text(elem), Recursive.plain_text(elem)),
+        (Xml.plain_text_exclude(elem, EXCLUDE),
+            Recursive.plain_text_exclude(elem, EXCLUDE)),
+        (DoxygenClassXml.description_text(elem),
+            Recursive.description_text(elem)),
+        (DoxygenClassXml.description_text_exclude(elem, EXCLUDE),
+            Recursive.description_text_exclude(elem, EXCLUDE)),
+    ]
+    for name in FIND_NAMES:
+        pairs.append((Xml.find_tag(elem, name), Recursive.find_tag(elem, name)))
+    for new, old in pairs:
+        if new is not old and new != old:
+            raise AssertionError(f'<{elem.tag}>: {new!r} != {old!r}')
+    return len(pairs)
+
+
+def check_files(xmldir) -> int:
+    count = 0
+    for filename in sorted(os.listdir(xmldir)):
+        if not filename.endswith('.xml'):
+            continue
+        root = ET.parse(os.path.join(xmldir, filename)).getroot()
+        for elem in root.iter():
+            count += check_element(elem)
+    return count
+
+
+def long_description(paragraphs) -> ET.Element:
+    '''A <detaileddescription> with many inline tags.'''
+    text = '<detaileddescription>'
+    for i in range(paragraphs):
+        text += (f'<para>Word {i} <computeroutput>code_{i}</computeroutput> '
+            f'and <ref refid="x">Ref{i}</ref> <bold> bold <emphasis> {i} '
+            '</emphasis></bold> tail. </para>\n')
+    text += '<para><simplesect kind="since"><para>0.1</para></simplesect></para>'
+    text += '</detaileddescription>'
+    return ET.fromstring(text)
+
+
+def deep_description(depth) -> ET.Element:
+    '''Markup nested depth times.'''
+    text = '<para> ' * depth + 'deep ' + '</para> tail ' * depth
+    return ET.fromstring(f'<detaileddescription>{text}</detaileddescription>')
+
+
+def time_pair(label, new, old, number):
+    new_time = min(timeit.repeat(new, number=number, repeat=3)) / number
+    try:
+        old_time = min(timeit.repeat(old, number=number, repeat=3)) / number
+    except RecursionError:
+        print(f'{label:<36}{new_time * 1e6:>12.1f}{"RecursionError":>16}')
+        return
+    print(f'{label:<36}{new_time * 1e6:>12.1f}{old_time * 1e6:>16.1f}'
+        f'{old_time / new_time:>8.2f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--xmldir', metavar='DIR',
+        help='also check the XML files in DIR')
+    parser.add_argument('--paragraphs', type=int, default=2000)
+    parser.add_argument('--depth', type=int, default=5000)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    count = 0
+    with tempfile.TemporaryDirectory(prefix='paradocs-text-') as tmpdir:
+        corpus.CorpusGenerator(corpus.CorpusConfig(classes=10)).write(tmpdir)
+        count += check_files(os.path.join(tmpdir, 'doxygen', 'xml'))
+    if args.xmldir is not None:
+        count += check_files(args.xmldir)
+    long_tree = long_description(args.paragraphs)
+    count += check_element(long_tree)
+    for para in long_tree:
+        count += check_element(para)
+    print(f'{count} comparisons, all identical.')
+    print()
+
+    deep_tree = deep_description(args.depth)
+    print(f'{"function (us per call)":<36}{"iterative":>12}{"recursive":>16}{"speedup":>9}')
+    for label, new, old in [
+        ('plain_text', Xml.plain_text, Recursive.plain_text),
+        ('description_text', DoxygenClassXml.description_text,
+            Recursive.description_text),
+    ]:
+        time_pair(f'{label} long', lambda: new(long_tree),
+            lambda: old(long_tree), args.number)
+        time_pair(f'{label} deep', lambda: new(deep_tree),
+            lambda: old(deep_tree), args.number)
+    for label, new, old in [
+        ('plain_text_exclude', Xml.plain_text_exclude,
+            Recursive.plain_text_exclude),
+        ('description_text_exclude', DoxygenClassXml.description_text_exclude,
+            Recursive.description_text_exclude),
+    ]:
+        time_pair(f'{label} long', lambda: new(long_tree, EXCLUDE),
+            lambda: old(long_tree, EXCLUDE), args.number)
+        time_pair(f'{label} deep', lambda: new(deep_tree, EXCLUDE),
+            lambda: old(deep_tree, EXCLUDE), args.number)
+    time_pair('find_tag long', lambda: Xml.find_tag(long_tree, 'simplesect'),
+        lambda: Recursive.find_tag(long_tree, 'simplesect'), args.number)
+    time_pair('find_tag deep', lambda: Xml.find_tag(deep_tree, 'missing'),
+        lambda: Recursive.find_tag(deep_tree, 'missing'), args.number)
+
+
+if __name__ == '__main__':
+    main()
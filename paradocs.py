@@ -14,33 +14,64 @@
 # along with this program.
 # If not, see <https://www.gnu.org/licenses/>.
 
+import argparse
+import contextlib
+import copy
+import datetime
+import fnmatch
+import io
 import os
 import sys
+import time
 import xml.etree.ElementTree as ET
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count, repeat
 from typing import List
 
 from paradocs_lib import (
-    Markdown, CppCode,
+    Markdown, PageWriter, CppCode,
     MemberType, MemberFunction,
-    TypeDictionary,
-    Xml, DoxygenClassXml,
+    TypeDictionary, TypeLinker,
+    Xml, XmlBackend, DoxygenClassXml, DoxygenClassStreamXml, DoxygenIndex,
     DetailedDescription,
+    Manifest, ParseCache, Profiler, Watcher, PageServer,
+    OutputSink, DirectorySink, SearchIndex,
+    __version__,
 )
 
 
 class Class:
+    __slots__ = ('_namespace', '_name', '_relative_name', '_enclosing_class',
+        '_link', '_include', '_file', '_file_hash', '_parsed', '_has_summary',
+        '_brief', '_detail', '_member_functions', '_template_params',
+        '_member_types', '_member_enums')
+
     def __init__(self, namespace, name):
-        self._namespace = namespace
-        self._name = name
+        self._namespace = sys.intern(namespace)
+        self._name = sys.intern(name)
+        # Derived values. The name never changes.
+        split = name.rsplit('::', 1)
+        self._relative_name = split[-1]
+        self._enclosing_class = split[0] if len(split) == 2 else ''
+        self._link = name.lower().replace('::', '')
         self._include = ''
         self._file = ''
+        self._file_hash = ''
+        self._parsed = False
+        self._has_summary = False
         self._brief = ''
         self._detail: DetailedDescription = None
         self._member_functions = []
         self._template_params = []
 
         self._member_types = []
+        self._member_enums = []
+
+    def _set_member_types(self, member_types: List[MemberType]):
+        self._member_types = member_types
+        self._member_enums = [x for x in member_types
+            if x.kind == MemberType.KIND_ENUM]
 
     def set_include(self, include):
         self._include = include
@@ -48,13 +79,71 @@ class Class:
     def set_file(self, filename):
         self._file = filename
 
-    def parse_file(self, docdir):
+    def set_file_hash(self, file_hash):
+        self._file_hash = file_hash
+
+    def parse_file(self, docdir, streaming=False):
+        '''Parse the XML file. If streaming is True, the file is read with
+        `DoxygenClassStreamXml` to keep peak memory low.'''
         filepath = docdir + '/' + self._file
-        doxygen_class_xml = DoxygenClassXml(self._namespace, filepath)
+        try:
+            if streaming:
+                doxygen_class_xml = DoxygenClassStreamXml(self._namespace,
+                    filepath)
+            else:
+                doxygen_class_xml = DoxygenClassXml(self._namespace, filepath)
+        except XmlBackend.PARSE_ERRORS as e:
+            # The parse errors do not name the file.
+            raise ValueError(f'{filepath}: {e}') from e
         self._brief = doxygen_class_xml.class_brief()
         self._member_functions = doxygen_class_xml.class_member_functions()
         self._template_params = doxygen_class_xml.class_template_params() or []
-        self._member_types = doxygen_class_xml.member_types()
+        self._set_member_types(doxygen_class_xml.member_types())
+        self._parsed = True
+        self._has_summary = True
+
+    def parse_result(self) -> dict:
+        '''Everything `parse_file()` reads from the file.'''
+        return {
+            'brief': self._brief,
+            'member_functions': self._member_functions,
+            'template_params': self._template_params,
+            'member_types': self._member_types,
+        }
+
+    def set_parse_result(self, result: dict):
+        '''Restore a `parse_result()` instead of parsing the file.'''
+        self._brief = result['brief']
+        self._member_functions = result['member_functions']
+        self._template_params = result['template_params']
+        self._set_member_types(result['member_types'])
+        self._parsed = True
+        self._has_summary = True
+
+    def summary(self) -> dict:
+        '''What the index page and the type dictionary need from the file.'''
+        return {
+            'brief': self._brief,
+            'enums': [enum.full_name for enum in self.member_enums()],
+        }
+
+    def load_summary(self, summary: dict):
+        '''Restore a summary instead of parsing the file. The file must be
+        parsed before rendering the class page.'''
+        self._brief = summary['brief']
+        self.set_enum_names(summary['enums'])
+        self._has_summary = True
+
+    def set_enum_names(self, full_names: List[str]):
+        '''Register the member enums by name only, without parsing the file.
+        The brief is unknown until the file is parsed.'''
+        member_types = []
+        for full_name in full_names:
+            class_name, name = full_name.rsplit('::', 1)
+            member_types.append(
+                MemberType(class_name, name, MemberType.KIND_ENUM))
+        self._set_member_types(member_types)
+        self._parsed = False
 
     @property
     def name(self) -> str:
@@ -63,7 +152,29 @@ class Class:
 
     @property
     def relative_name(self) -> str:
-        return self.name.rsplit('::', 1)[-1]
+        return self._relative_name
+
+    @property
+    def namespace(self) -> str:
+        return self._namespace
+
+    @property
+    def file(self) -> str:
+        return self._file
+
+    @property
+    def file_hash(self) -> str:
+        '''Content hash of the XML file. Empty if not computed.'''
+        return self._file_hash
+
+    @property
+    def parsed(self) -> bool:
+        return self._parsed
+
+    @property
+    def has_summary(self) -> bool:
+        '''True if the brief and the member enums are known.'''
+        return self._has_summary
 
     @property
     def include(self) -> str:
@@ -85,14 +196,12 @@ class Class:
     @property
     def link(self):
         '''Link to this class.'''
-        ret = self._name.lower().replace('::', '')
-
-        return ret
+        return self._link
 
     @property
     def filename(self):
         '''Output filename.'''
-        return self.link + '.md'
+        return self._link + '.md'
 
     @property
     def template_params(self):
@@ -100,16 +209,11 @@ class Class:
 
     @property
     def enclosing_class(self) -> str:
-        if self.name.find('::') == -1:
-            return ''
-        split = self.name.rsplit('::', 1)
-        return split[0]
+        return self._enclosing_class
 
     def member_enums(self) -> List[MemberType]:
-        '''Filter member types that kind is enum.'''
-        f = filter(lambda x: x.kind == MemberType.KIND_ENUM,
-            self._member_types)
-        return list(f)
+        '''Member types that kind is enum.'''
+        return list(self._member_enums)
 
     def h1_table(self, type_dictionary: TypeDictionary | None=None):
         # Escape < and >.
@@ -134,53 +238,76 @@ class Class:
         return Markdown.table(head, body)
 
     def member_functions_table(self):
-        txt = '| Return | Declaration |\n'
-        txt += '|-------|-------------|\n'
+        out = io.StringIO()
+        self.write_member_functions_table(out)
+        return out.getvalue()
+
+    def write_member_functions_table(self, out,
+            linker: TypeLinker | None=None):
+        out.write('| Return | Declaration |\n')
+        out.write('|-------|-------------|\n')
         for member in self._member_functions:
-            txt += member.table_row()
-        return txt
+            out.write(member.table_row(linker))
 
     def member_types_section(self):
+        out = io.StringIO()
+        self.write_member_types_section(out)
+        return out.getvalue()
+
+    def write_member_types_section(self, out,
+            linker: TypeLinker | None=None):
         if len(self._member_types) == 0:
-            return ''
+            return
 
-        text = '## Member Types\n\n'
+        out.write('## Member Types\n\n')
         # Aliases.
         aliases = list(filter(lambda x: x.kind == MemberType.KIND_ALIAS, self._member_types))
         if len(aliases) > 0:
-            text += '**Aliases**\n\n'
+            out.write('**Aliases**\n\n')
         for alias in aliases:
-            text += f'using {alias.name} = {alias.alias_type}\n\n'
+            alias_type = alias.alias_type
+            if linker is not None:
+                alias_type = linker.link_code(alias_type, self._name)
+            out.write(f'using {alias.name} = {alias_type}\n\n')
         # Enum classes.
-        enums = list(filter(lambda x: x.kind == MemberType.KIND_ENUM, self._member_types))
+        enums = self._member_enums
         if len(enums) != 0:
-            text += '**Enums**\n\n'
+            out.write('**Enums**\n\n')
         for enum in enums:
             link = f'#{enum.anchor_id}'
-            text += f'enum class {Markdown.link(enum.name, link)}\n\n'
-
-        return text
+            out.write(f'enum class {Markdown.link(enum.name, link)}\n\n')
 
     def member_type_details_section(self):
         '''Only KIND_ENUM.'''
-        member_types: List[MemberType] = list(filter(
-            lambda x: x.kind == MemberType.KIND_ENUM,
-            self._member_types
-        ))
+        out = io.StringIO()
+        self.write_member_type_details_section(out)
+        return out.getvalue()
+
+    def write_member_type_details_section(self, out,
+            linker: TypeLinker | None=None):
+        member_types: List[MemberType] = self._member_enums
         if len(member_types) == 0:
-            return ''
+            return
 
-        text = '## Member Type Details\n\n'
+        out.write('## Member Type Details\n\n')
 
         for member_type in member_types:
-            text += member_type.heading() + '\n\n'
-            text += member_type.description() + '\n'
-            text += member_type.table() + '\n\n'
+            out.write(member_type.heading() + '\n\n')
+            out.write(member_type.description(linker) + '\n')
+            member_type.write_table(out)
+            out.write('\n\n')
 
-        return text
+
+def _parse_class(klass: Class, docdir: str, streaming: bool) -> Class:
+    '''Process pool worker. Return the parsed copy of the class.'''
+    klass.parse_file(docdir, streaming)
+    return klass
 
 
 class Project:
+    # Keys of the page contexts. A new one is taken when the types change.
+    _page_keys = count()
+
     def __init__(self, filename: str):
         self._filename = filename
         self._name = ''
@@ -190,12 +317,28 @@ class Project:
         self._docdir = ''
         self._outdir = 'paradocs'
         self._basepath = '/'
+        self._streaming = False
+        self._lazy = False
+        self._selection = None
+        self._parse_cache: ParseCache | None = None
+        self._profiler: Profiler | None = None
+        self._doxygen_index: DoxygenIndex | None = None
         self._category_trees: List[ET.Element] = []
         self._classes = {} # {"Category": [], ...}
+        self._classes_by_name = {} # {"Name": Class, ...}
         self._type_dictionary = TypeDictionary()
+        self._type_linker: TypeLinker | None = None
+        # Enums registered from index.xml, which lists the enums of every
+        # protection. Confirmed when a page links them.
+        self._enum_candidates = {} # {"Enum": Class}
+        self._page_key = next(Project._page_keys)
 
         self._root = ET.parse(filename).getroot()
 
+    @property
+    def name(self) -> str:
+        return self._name
+
     @property
     def basepath(self) -> str:
         return self._basepath
@@ -204,6 +347,10 @@ class Project:
     def outdir(self) -> str:
         return self._outdir
 
+    @property
+    def docdir(self) -> str:
+        return self._docdir
+
     @property
     def version(self) -> str:
         return self._version
@@ -221,10 +368,77 @@ class Project:
 
         return ret
 
+    def set_streaming(self, streaming: bool):
+        '''Parse the XML files with the streaming parser.'''
+        self._streaming = streaming
+
+    def set_lazy(self, lazy: bool):
+        '''Register classes and their enums by name only, and parse each
+        class when its page or the index page is rendered.'''
+        self._lazy = lazy
+
+    def set_selection(self, names: List[str] | None):
+        '''Only the named classes are parsed. The other classes and their
+        enums are registered by name, as in lazy mode, so that the pages
+        link the same types as in a full build. Their files are read only
+        if the pages link their enums.'''
+        self._selection = names
+
+    def set_parse_cache(self, parse_cache: ParseCache | None):
+        '''Load parsed classes from the cache and store new ones in it.'''
+        self._parse_cache = parse_cache
+
+    def set_profiler(self, profiler: Profiler | None):
+        '''Record the parse and render time of each class.'''
+        self._profiler = profiler
+
+    def measure(self, kind: str, class_name: str):
+        '''Context manager adding the time of the block to the profiler.'''
+        if self._profiler is None:
+            return contextlib.nullcontext()
+        return self._profiler.measure(kind, class_name)
+
+    def find_class(self, class_name: str) -> Class | None:
+        '''Return the class with the name, or None.'''
+        return self._classes_by_name.get(class_name)
+
     def type_dictionary(self) -> TypeDictionary:
         '''Return TypeDictionary object.'''
         return self._type_dictionary
 
+    def _types_changed(self):
+        self._type_linker = None
+        self._page_key = next(Project._page_keys)
+
+    @property
+    def page_key(self) -> int:
+        '''Changes when `page_context()` changes.'''
+        return self._page_key
+
+    def page_context(self) -> 'Project':
+        '''Copy of the project with what rendering a class page needs: the
+        metadata, the options and the type dictionary, without the classes
+        and the XML trees. Sent to the page pool workers, with the classes
+        of each chunk.'''
+        context = copy.copy(self)
+        context._root = None
+        context._category_trees = []
+        context._classes = {}
+        context._classes_by_name = {}
+        context._doxygen_index = None
+        context._type_linker = None
+        context._enum_candidates = {}
+        context._profiler = None
+        return context
+
+    def type_linker(self) -> TypeLinker:
+        '''Linker of the types in the type dictionary. Built on first use
+        and again after the types change.'''
+        if self._type_linker is None:
+            self._type_linker = TypeLinker(self._type_dictionary,
+                self._basepath, self._namespace)
+        return self._type_linker
+
     def parse_metadata(self):
         root = self._root
         project = root[0]
@@ -237,12 +451,15 @@ class Project:
         namespace = Xml.find_tag(project, 'namespace')
         if namespace is not None:
             self._namespace = Xml.plain_text(namespace)
-        # Set docdir.
-        self._docdir = Xml.plain_text(Xml.find_tag(project, 'docdir'))
+        # Set docdir. Relative paths are relative to the project file.
+        basedir = os.path.dirname(self._filename)
+        self._docdir = os.path.join(basedir,
+            Xml.plain_text(Xml.find_tag(project, 'docdir')))
         # Set outdir.
         outdir = Xml.find_tag(project, 'outdir')
         if outdir is not None:
             self._outdir = Xml.plain_text(outdir)
+        self._outdir = os.path.join(basedir, self._outdir)
         # Set basepath.
         basepath = Xml.find_tag(project, 'basepath')
         if basepath is None:
@@ -255,37 +472,302 @@ class Project:
         categories = Xml.filter_tags(project, 'category')
         self._category_trees = categories
 
-    def parse_category_trees(self):
+    def parse_category_trees(self, manifest: Manifest | None=None,
+            jobs: int=1, executor: ProcessPoolExecutor | None=None):
+        '''Parse the classes. If a manifest is given, classes whose XML file
+        is unchanged are restored from it instead of parsed. In lazy mode,
+        the other classes are registered from index.xml. Otherwise classes
+        found in the parse cache are loaded from it, and if jobs is greater
+        than 1, the rest is parsed in a process pool, the executor if
+        given.'''
+        pending = [] # [("Category", index, Class)]
+        listed = self._listed_class_names()
+        names = set()
         for tree in self._category_trees:
             category_name = self._find_category_name(tree)
             self._classes[category_name] = []
-            for klass_tree in tree:
-                if klass_tree.tag != 'class':
-                    continue
-                klass_ns = klass_tree.attrib['namespace']
-                klass_file = klass_tree.attrib['file']
-                klass_name = ''
-                klass_include = ''
-                for child in klass_tree:
-                    if child.tag == 'name':
-                        klass_name = child.text
-                    elif child.tag == 'include':
-                        klass_include = child.text
+            for klass_ns, klass_name, klass_file, klass_include in \
+                    self._category_entries(tree, listed, names):
+                if klass_name in names:
+                    raise ValueError(f'Duplicate class name: {klass_name}')
+                names.add(klass_name)
 
                 klass = Class(klass_ns, klass_name)
                 klass.set_include(klass_include)
                 klass.set_file(klass_file)
-                klass.parse_file(self._docdir)
+                if self._selection is not None and \
+                        klass_name not in self._selection:
+                    # Not written. Registered by name only.
+                    self._register_enums(klass)
+                    self._classes[category_name].append(klass)
+                    continue
+                summary = None
+                if manifest is not None or \
+                        (self._parse_cache is not None and not self._lazy):
+                    file_hash = Manifest.hash_file(
+                        self._docdir + '/' + klass_file)
+                    klass.set_file_hash(file_hash)
+                if manifest is not None:
+                    summary = manifest.class_summary(klass.name, file_hash)
+                if summary is not None:
+                    klass.load_summary(summary)
+                elif self._lazy:
+                    self._register_enums(klass)
+                elif not self._load_cached(klass):
+                    index = len(self._classes[category_name])
+                    pending.append((category_name, index, klass))
                 self._classes[category_name].append(klass)
 
-                # Type dictionary.
-                t = TypeDictionary.Type(klass.name,
-                    TypeDictionary.Type.KIND_CLASS)
+        if self._selection is not None:
+            for name in self._selection:
+                if name not in names:
+                    raise ValueError(f'Unknown class: {name}')
+
+        self._parse_classes(pending, jobs, executor)
+        for category, index, _ in pending:
+            self._store_cached(self._classes[category][index])
+
+        for klass in self.classes():
+            self._classes_by_name[klass.name] = klass
+            # Type dictionary.
+            t = TypeDictionary.Type(klass.name,
+                TypeDictionary.Type.KIND_CLASS)
+            self._type_dictionary.add_type(t)
+            for enum in klass.member_enums():
+                t = TypeDictionary.Type(enum.full_name,
+                    TypeDictionary.Type.KIND_ENUM)
                 self._type_dictionary.add_type(t)
-                for enum in klass.member_enums():
-                    t = TypeDictionary.Type(enum.full_name,
-                        TypeDictionary.Type.KIND_ENUM)
-                    self._type_dictionary.add_type(t)
+        self._types_changed()
+
+    def _parse_classes(self, pending, jobs: int,
+            executor: ProcessPoolExecutor | None=None):
+        '''Parse the pending classes in place of their unparsed objects.'''
+        if jobs <= 1 or len(pending) <= 1:
+            for _, _, klass in pending:
+                with self.measure('parse', klass.name):
+                    klass.parse_file(self._docdir, self._streaming)
+            return
+
+        klasses = [klass for _, _, klass in pending]
+        chunksize = max(1, len(klasses) // (jobs * 4))
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=jobs)
+        try:
+            parsed = executor.map(_parse_class, klasses,
+                repeat(self._docdir), repeat(self._streaming),
+                chunksize=chunksize)
+            for (category, index, _), klass in zip(pending, parsed):
+                self._classes[category][index] = klass
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+    def update_files(self, filenames) -> List[Class]:
+        '''Re-parse the classes of the XML files whose content changed and
+        update their types. The public types of the classes registered by
+        name only are scanned, since index.xml may be older than their
+        files. Return the changed classes.'''
+        changed = []
+        for klass in self.classes():
+            if klass.file not in filenames:
+                continue
+            old_enums = [enum.full_name for enum in klass.member_enums()]
+            if not klass.has_summary:
+                for name in old_enums:
+                    self._enum_candidates.pop(name, None)
+                klass.set_enum_names(self._public_enum_names(klass))
+            else:
+                file_hash = Manifest.hash_file(
+                    self._docdir + '/' + klass.file)
+                if file_hash == klass.file_hash:
+                    continue
+                klass.set_file_hash(file_hash)
+                self._parse_file(klass)
+            self._replace_enum_types(klass, old_enums)
+            changed.append(klass)
+        if len(changed) > 0:
+            self._types_changed()
+
+        return changed
+
+    def record_summaries(self, manifest: Manifest):
+        '''Record the summaries of the classes that have one.'''
+        for klass in self.classes():
+            if klass.has_summary and klass.file_hash != '':
+                manifest.set_class_summary(klass.name, klass.file_hash,
+                    klass.summary())
+
+    def _register_enums(self, klass: Class):
+        '''Register the member enums of the class without parsing it. The
+        enums listed in index.xml are candidates until a page links one of
+        them or the class is parsed. Without index.xml, the public types of
+        the class are scanned.'''
+        for enum in klass.member_enums():
+            self._enum_candidates.pop(enum.full_name, None)
+        if self._doxygen_index is None and \
+                not os.path.exists(self._docdir + '/index.xml'):
+            klass.set_enum_names(self._public_enum_names(klass))
+            return
+        full_name = klass.name
+        if klass.namespace != '':
+            full_name = f'{klass.namespace}::{klass.name}'
+        compound = self.doxygen_index().find(full_name)
+        names = compound.enums if compound is not None else []
+        klass.set_enum_names([f'{klass.name}::{name}' for name in names])
+        for enum in klass.member_enums():
+            self._enum_candidates[enum.full_name] = klass
+
+    def _public_enum_names(self, klass: Class) -> List[str]:
+        '''Full names of the public member enums, from a scan of the public
+        types of the class.'''
+        filepath = self._docdir + '/' + klass.file
+        try:
+            names = DoxygenClassStreamXml.public_enum_names(filepath)
+        except XmlBackend.PARSE_ERRORS as e:
+            raise ValueError(f'{filepath}: {e}') from e
+        return [f'{klass.name}::{name}' for name in names]
+
+    def confirm_enums(self, type_names) -> bool:
+        '''Scan the classes of the candidate enums among the type names, and
+        keep only their public enums. Return True if the types changed.'''
+        changed = False
+        for name in type_names:
+            klass = self._enum_candidates.get(name)
+            if klass is None:
+                continue
+            old_enums = [enum.full_name for enum in klass.member_enums()]
+            for old_name in old_enums:
+                del self._enum_candidates[old_name]
+            klass.set_enum_names(self._public_enum_names(klass))
+            changed = self._replace_enum_types(klass, old_enums) or changed
+        if changed:
+            self._types_changed()
+
+        return changed
+
+    def _replace_enum_types(self, klass: Class, old_enums: List[str]) -> bool:
+        '''Replace the enum types of the old names by the member enums of
+        the class. Return True if they differ.'''
+        new_enums = [enum.full_name for enum in klass.member_enums()]
+        if new_enums == old_enums:
+            return False
+        for name in old_enums:
+            if name not in new_enums:
+                self._type_dictionary.remove_type(name)
+        for name in new_enums:
+            if name not in old_enums:
+                self._type_dictionary.add_type(TypeDictionary.Type(
+                    name, TypeDictionary.Type.KIND_ENUM))
+
+        return True
+
+    def ensure_parsed(self, klass: Class):
+        '''Parse the class if it was only registered. Its candidate enums
+        are replaced by the parsed ones.'''
+        if klass.parsed:
+            return
+        old_enums = [enum.full_name for enum in klass.member_enums()]
+        for name in old_enums:
+            self._enum_candidates.pop(name, None)
+        self._parse_file(klass)
+        if self._replace_enum_types(klass, old_enums):
+            self._types_changed()
+
+    def _load_cached(self, klass: Class) -> bool:
+        '''Load the class from the parse cache. False if not cached.'''
+        if self._parse_cache is None:
+            return False
+        key = self._parse_cache.key(klass.namespace, klass.file_hash)
+        result = self._parse_cache.load(key)
+        if result is None:
+            return False
+        klass.set_parse_result(result)
+
+        return True
+
+    def _store_cached(self, klass: Class):
+        if self._parse_cache is None:
+            return
+        key = self._parse_cache.key(klass.namespace, klass.file_hash)
+        self._parse_cache.store(key, klass.parse_result())
+
+    def _parse_file(self, klass: Class):
+        '''Parse the class, or load it from the parse cache.'''
+        if klass.file_hash == '':
+            klass.set_file_hash(
+                Manifest.hash_file(self._docdir + '/' + klass.file))
+        if self._load_cached(klass):
+            return
+        with self.measure('parse', klass.name):
+            klass.parse_file(self._docdir, self._streaming)
+        self._store_cached(klass)
+
+    def doxygen_index(self) -> DoxygenIndex:
+        '''Doxygen's index.xml in docdir. Read on first use.'''
+        if self._doxygen_index is None:
+            filepath = self._docdir + '/index.xml'
+            try:
+                self._doxygen_index = DoxygenIndex(filepath)
+            except XmlBackend.PARSE_ERRORS as e:
+                raise ValueError(f'{filepath}: {e}') from e
+        return self._doxygen_index
+
+    def _listed_class_names(self) -> set:
+        '''Names of the classes listed with <class> tags.'''
+        names = set()
+        for tree in self._category_trees:
+            for klass_tree in Xml.filter_tags(tree, 'class'):
+                name = klass_tree.findtext('name')
+                if name is not None:
+                    names.add(name)
+        return names
+
+    def _category_entries(self, tree: ET.Element, listed: set, added: set):
+        '''List of (namespace, name, file, include) of the classes in the
+        category, in order of the tags.
+
+        A <class> tag without file attribute is looked up in index.xml. A
+        <match> tag adds the classes of the project namespace in index.xml
+        whose names match the glob, except the classes listed with <class>
+        tags or added before.'''
+        entries = []
+        matched = set()
+        for child in tree:
+            if child.tag == 'class':
+                klass_ns = child.attrib.get('namespace', self._namespace)
+                klass_name = ''
+                klass_include = ''
+                for grandchild in child:
+                    if grandchild.tag == 'name':
+                        klass_name = grandchild.text
+                    elif grandchild.tag == 'include':
+                        klass_include = grandchild.text
+                klass_file = child.attrib.get('file')
+                if klass_file is None:
+                    klass_file = self._find_class_file(klass_ns, klass_name)
+                entries.append((klass_ns, klass_name, klass_file, klass_include))
+            elif child.tag == 'match':
+                pattern = (child.text or '').strip()
+                klass_include = child.attrib.get('include', '')
+                index = self.doxygen_index()
+                for name in index.class_names(self._namespace):
+                    if name in listed or name in added or name in matched:
+                        continue
+                    if not fnmatch.fnmatchcase(name, pattern):
+                        continue
+                    matched.add(name)
+                    klass_file = self._find_class_file(self._namespace, name)
+                    entries.append((self._namespace, name, klass_file,
+                        klass_include))
+        return entries
+
+    def _find_class_file(self, namespace: str, name: str) -> str:
+        full_name = f'{namespace}::{name}' if namespace != '' else name
+        compound = self.doxygen_index().find(full_name)
+        if compound is None:
+            raise ValueError(f'Class not found in index.xml: {full_name}')
+        return compound.file
 
     @staticmethod
     def _find_category_name(category_tree: ET.Element) -> str:
@@ -297,109 +779,804 @@ class Project:
         return None
 
     def index_page(self) -> str:
-        txt = '# ' + self._name
-        txt = txt + '\n\n'
-        txt = txt + Markdown.table(
+        out = io.StringIO()
+        self.write_index_page(out)
+        return out.getvalue()
+
+    def write_index_page(self, out):
+        for klass in self.classes():
+            if not klass.has_summary:
+                self.ensure_parsed(klass)
+
+        out.write('# ' + self._name)
+        out.write('\n\n')
+        Markdown.write_table(out,
             ['-', '-'],
             [['Version', self.version], ['Namespace', self.namespace]]
         )
-        txt = txt + '\n'
-        txt = txt + self._description
-        txt = txt + '\n'
+        out.write('\n')
+        out.write(self._description)
+        out.write('\n')
+        basepath = self.basepath
+        if basepath.endswith('/'):
+            basepath = basepath.rstrip('/')
         for category in self._classes:
-            txt += f'## {category}\n\n'
-            class_summaries = []
-            for klass in self._classes[category]:
-                basepath = self.basepath
-                if basepath.endswith('/'):
-                    basepath = basepath.rstrip('/')
-                class_summaries.append([
-                    Markdown.link(klass.name, f'{basepath}/{klass.link}'),
-                    klass.brief
-                ])
-            txt += Markdown.table(['Name', 'Brief'], class_summaries)
-            txt += '\n'
-
-        return txt
+            out.write(f'## {category}\n\n')
+            class_summaries = (
+                [Markdown.link(klass.name, f'{basepath}/{klass.link}'), klass.brief]
+                for klass in self._classes[category]
+            )
+            Markdown.write_table(out, ['Name', 'Brief'], class_summaries)
+            out.write('\n')
 
     def class_page(self, class_name) -> str:
-        # Find class.
-        klass: Class | None = None
-        for category in self._classes:
-            class_list = self._classes[category]
-            for cls in class_list:
-                if cls.name == class_name:
-                    klass = cls
+        klass = self.find_class(class_name)
         if klass is None:
-            print('Class not found.')
-            exit(1)
+            raise LookupError(f'Class not found: {class_name}')
+
+        return self.render_class(klass)
 
-        txt = '# ' + klass.name
-        txt += '\n\n'
+    def render_class(self, klass: Class) -> str:
+        '''Render the page of the class.'''
+        out = io.StringIO()
+        self.write_class_page(klass, out)
+        return out.getvalue()
+
+    def write_class_page(self, klass: Class, out) -> set:
+        '''Render the page of the class to out. Return the words of the
+        texts the page linked and the names of the hierarchy.'''
+        self.ensure_parsed(klass)
+        if len(self._enum_candidates) == 0:
+            return self._record_class_page(klass, out)
+        # The candidate enums linked by the page are confirmed first. If one
+        # is not public, the page is rendered again without it.
+        linked = set()
+        page = io.StringIO()
+        names = self._record_class_page(klass, page, linked)
+        while self.confirm_enums(linked):
+            linked = set()
+            page = io.StringIO()
+            names = self._record_class_page(klass, page, linked)
+        out.write(page.getvalue())
+
+        return names
+
+    def _record_class_page(self, klass: Class, out,
+            linked: set | None=None) -> set:
+        linker = self.type_linker()
+        with linker.recording(linked) as names:
+            self._write_class_page(klass, out, linker)
+        # The hierarchy looks up the enclosing classes.
+        names.update(klass.name.split('::'))
+
+        return names
+
+    def _write_class_page(self, klass: Class, out, linker: TypeLinker):
+
+        out.write('# ' + klass.name)
+        out.write('\n\n')
         if len(klass.template_params) > 0:
-            txt += '**template <'
-            txt += ', '.join(klass.template_params)
-            txt += '>**'
-            txt += '\n\n'
-        txt += klass.brief
-        txt += '\n\n'
-        txt += klass.h1_table(self.type_dictionary())
-        txt += '\n\n'
+            out.write('**template <')
+            out.write(', '.join(klass.template_params))
+            out.write('>**')
+            out.write('\n\n')
+        out.write(linker.link_text(klass.brief, klass.name))
+        out.write('\n\n')
+        out.write(klass.h1_table(self.type_dictionary()))
+        out.write('\n\n')
         # "## Member Types"
-        txt += klass.member_types_section()
-        txt += '## Member Functions\n\n'
-        txt += klass.member_functions_table()
-        txt += '\n'
-        txt += klass.member_type_details_section()
-        txt += '## Member Function Details\n\n'
+        klass.write_member_types_section(out, linker)
+        out.write('## Member Functions\n\n')
+        klass.write_member_functions_table(out, linker)
+        out.write('\n')
+        klass.write_member_type_details_section(out, linker)
+        out.write('## Member Function Details\n\n')
         for func in klass.member_functions:
-            txt += func.heading() + '\n\n'
+            out.write(func.heading(linker=linker) + '\n\n')
             if func.is_template():
-                txt += func.template_decl() + '\n\n'
-            txt += func.description() + '\n'
+                out.write(func.template_decl() + '\n\n')
+            out.write(func.description(linker) + '\n')
 
-        return txt
+    def class_page_files(self, klass: Class) -> dict:
+        '''{"file": hash} of the XML files the class page is built from,
+        other than the project file. The types it links are recorded by
+        `write_class_page()`.'''
+        return {klass.file: klass.file_hash}
 
+    def index_page_files(self) -> dict:
+        '''{"file": hash} of the XML files the index page is built from,
+        other than the project file. That is the briefs of all classes.'''
+        return {klass.file: klass.file_hash for klass in self.classes()}
+
+
+_page_project: Project | None = None
+_page_key: int | None = None
+_page_sink: OutputSink | None = None
+_page_search = False
+
+
+def _init_page_worker(project: Project, sink: OutputSink | None,
+        search: bool=False, key: int | None=None):
+    '''Set the project of the page workers. A project with the key of
+    the current one is dropped, so that its type linker is reused.'''
+    global _page_project, _page_key, _page_sink, _page_search
+    if key is None or key != _page_key:
+        _page_project = project
+        _page_key = key
+    _page_sink = sink
+    _page_search = search
+
+
+def _write_class_page(klass: Class) -> dict:
+    '''Page pool worker. Return {"hash": str, "data": bytes, "search": [],
+    "names": set, "error": str}. Without a sink, the page is returned as
+    data for the main process to add. The search entries are None unless
+    requested. On failure, only the error is set.'''
+    result = {'hash': None, 'data': None, 'search': None, 'names': set(),
+        'error': None}
+    try:
+        names = result['names']
+
+        def render(out):
+            names.update(_page_project.write_class_page(klass, out))
+
+        with _page_project.measure('render', klass.name):
+            if _page_sink is None:
+                result['data'], result['hash'] = OutputSink.render_page(render)
+            else:
+                result['hash'] = _page_sink.write_page(klass.filename, render)
+        if _page_search:
+            result['search'] = SearchIndex.class_entries(klass,
+                _page_project.basepath)
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    return result
+
+
+def _write_class_pages(key: int, context: Project, sink: OutputSink | None,
+        search: bool, klasses: List[Class]) -> List[dict]:
+    '''Page pool worker. Write the pages of a chunk of classes. The pool
+    may be shared by projects, so the page context of the project comes
+    with each chunk. It is kept while the key is the same.'''
+    _init_page_worker(context, sink, search, key)
+    return [_write_class_page(klass) for klass in klasses]
+
+
+def write_pages(project: Project, sink: OutputSink,
+        manifest: Manifest | None, jobs: int=1,
+        classes: List[Class] | None=None,
+        search_index: SearchIndex | None=None, explain: bool=False,
+        executor: ProcessPoolExecutor | None=None,
+        stats: dict | None=None):
+    '''Write the pages whose inputs changed, by the dependency graph in the
+    manifest. Without a manifest, every page is written. Only the pages of
+    the classes are checked if given, and the index page. If jobs is
+    greater than 1, the class pages are rendered in a process pool, the
+    executor if given, while the index page is written. If a search index
+    is given, its shards are updated. If explain is True, print why each
+    page is rebuilt. The numbers of "written", "up to date" and "failed"
+    pages are added to stats if given. Return the list of (page, error)
+    that failed.'''
+    if stats is None:
+        stats = {}
+    for key in ('written', 'up to date', 'failed'):
+        stats.setdefault(key, 0)
+    failures = []
+    stale = [] # [Class]
+    if classes is None:
+        classes = project.classes()
+    search = search_index is not None
+    if manifest is not None:
+        manifest.set_types(t.name for t in project.type_dictionary().types())
+    for klass in classes:
+        if manifest is not None:
+            reason = manifest.page_stale_reason(klass.filename,
+                project.class_page_files(klass))
+            if reason is None:
+                print('Class file for ' + klass.name + ' is up to date.')
+                stats['up to date'] += 1
+                continue
+            if explain:
+                print(f'{klass.filename}: {reason}.')
+        stale.append(klass)
+    own_executor = False
+    if jobs > 1 and len(stale) > 1:
+        # Archives are written by this process only.
+        worker_sink = sink if sink.concurrent else None
+        if executor is None:
+            own_executor = True
+            executor = ProcessPoolExecutor(max_workers=jobs)
+        # The page context is sent with each chunk, so fewer than for
+        # parsing.
+        chunksize = -(-len(stale) // (jobs * 2))
+        context = project.page_context()
+        futures = [executor.submit(_write_class_pages, project.page_key,
+                context, worker_sink, search, stale[i:i + chunksize])
+            for i in range(0, len(stale), chunksize)]
+        results = (result for future in futures
+            for result in future.result())
+    else:
+        _init_page_worker(project, sink, search)
+        results = map(_write_class_page, stale)
 
-if __name__ == '__main__':
-    project = Project('paradocs.xml')
-    project.parse_metadata()
-    project.parse_categories()
-    project.parse_category_trees()
-
-    if len(sys.argv) >= 2:
-        opt = sys.argv[1]
-        if opt == '--test':
-            print(project.type_dictionary())
-            print(project.index_page())
-            print('---------------------------')
-            print(project.class_page('EnumTest'))
-            print('---------------------------')
-            print(project.class_page('TemplateTest'))
-            print('---------------------------')
-            print(project.class_page('Enclosing::Nested'))
-            print('---------------------------')
-            print(project.class_page('Enclosing'))
-            exit(0)
-        elif opt == '--version':
-            print('Paradocs v0.1.0')
-            exit(0)
-        elif opt == '--help':
-            print('TODO: Add help')
-            exit(0)
-
-    # Make directory.
-    os.makedirs(project.outdir, exist_ok=True)
     # Index page.
-    print('Writing index file...', end='')
-    f = open(project.outdir + '/index.md', 'w')
-    f.write(project.index_page())
-    f.close()
-    print(' Done.')
+    index_files = project.index_page_files()
+    reason = ''
+    if manifest is not None:
+        reason = manifest.page_stale_reason('index.md', index_files)
+    if reason is None:
+        print('Index file is up to date.')
+        stats['up to date'] += 1
+    else:
+        if explain and manifest is not None:
+            print(f'index.md: {reason}.')
+        try:
+            page_hash = sink.write_page('index.md', project.write_index_page)
+            if manifest is not None:
+                manifest.set_page_dependencies('index.md', index_files, [],
+                    page_hash)
+            print('Writing index file... Done.')
+            stats['written'] += 1
+        except OSError as e:
+            failures.append(('index.md', f'{type(e).__name__}: {e}'))
+            stats['failed'] += 1
     # Class pages.
+    for klass, result in zip(stale, results):
+        error = result['error']
+        if error is None and result['data'] is not None:
+            try:
+                sink.add_page(klass.filename, result['data'])
+            except OSError as e:
+                error = f'{type(e).__name__}: {e}'
+        if error is not None:
+            print('Writing class file for ' + klass.name + '... Failed.')
+            failures.append((klass.name, error))
+            stats['failed'] += 1
+            continue
+        if manifest is not None:
+            manifest.set_page_dependencies(klass.filename,
+                project.class_page_files(klass), result['names'],
+                result['hash'])
+        if search:
+            search_index.set_entries(klass.name, klass.file_hash,
+                result['search'])
+        print('Writing class file for ' + klass.name + '... Done.')
+        stats['written'] += 1
+    if own_executor:
+        executor.shutdown()
+    if search:
+        failed = set(name for name, _ in failures)
+        failures += write_search_index(project, sink, manifest, search_index,
+            failed)
+
+    return failures
+
+
+def write_search_index(project: Project, sink: OutputSink,
+        manifest: Manifest | None, search_index: SearchIndex,
+        failed: set=frozenset()):
+    '''Write the shards of the search index that changed. Classes without
+    entries in this or the previous build are parsed for them, except the
+    failed classes, which keep their previous entries. Return the list of
+    (file, error) that failed.'''
+    failures = []
     for klass in project.classes():
-        print('Writing class file for ' + klass.name + '...', end='')
-        f = open(project.outdir + '/' + klass.link + '.md', 'w')
-        f.write(project.class_page(klass.name))
-        f.close()
-        print(' Done.')
+        if klass.name in failed:
+            continue
+        if search_index.entries(klass.name, klass.file_hash) is not None:
+            continue
+        try:
+            project.ensure_parsed(klass)
+        except (ValueError, OSError) as e:
+            failures.append((klass.name, f'{type(e).__name__}: {e}'))
+            continue
+        search_index.set_entries(klass.name, klass.file_hash,
+            SearchIndex.class_entries(klass, project.basepath))
+    search_index.finish([klass.name for klass in project.classes()])
+    written = 0
+    for filename, text in search_index.shards().items():
+        inputs = Manifest.hash_text(text)
+        if manifest is not None and manifest.is_page_fresh(filename, inputs):
+            continue
+        try:
+            page_hash = sink.write_page(filename, lambda out: out.write(text))
+        except OSError as e:
+            failures.append((filename, f'{type(e).__name__}: {e}'))
+            continue
+        if manifest is not None:
+            manifest.set_page(filename, inputs, page_hash)
+        written += 1
+    print(f'Writing search index... {written} file(s) updated.')
+
+    return failures
+
+
+def write_selected_pages(project: Project, sink: OutputSink,
+        names: List[str]):
+    '''Write the pages of the named classes without checking the manifest.
+    Return the list of (page, error) that failed.'''
+    failures = []
+    _init_page_worker(project, sink)
+    for name in names:
+        klass = project.find_class(name)
+        error = _write_class_page(klass)['error']
+        if error is not None:
+            print('Writing class file for ' + klass.name + '... Failed.')
+            failures.append((klass.name, error))
+            continue
+        print('Writing class file for ' + klass.name + '... Done.')
+
+    return failures
+
+
+def report_failures(failures) -> bool:
+    '''Print the failures. Return True if there is any.'''
+    if len(failures) == 0:
+        return False
+    print(f'{len(failures)} page(s) failed:')
+    for name, error in failures:
+        print(f'  {name}: {error}')
+    return True
+
+
+def load_project(args, parse_cache: ParseCache | None=None,
+        profiler: Profiler | None=None,
+        filename: str='paradocs.xml') -> Project:
+    '''Read the project file and apply the options. The classes are not
+    parsed.'''
+    project = Project(filename)
+    project.parse_metadata()
+    project.parse_categories()
+    project.set_streaming(args.streaming)
+    project.set_lazy(args.test or args.serve)
+    project.set_selection(args.only)
+    project.set_profiler(profiler)
+    if parse_cache is not None:
+        project.set_parse_cache(parse_cache)
+    return project
+
+
+def load_search_index(project: Project, args,
+        project_hash: str) -> SearchIndex | None:
+    '''Search index of the previous build, or None if disabled. Archives
+    are written as a whole, so their index starts empty.'''
+    if args.no_search_index:
+        return None
+    search_index = SearchIndex(project.outdir, __version__, project_hash)
+    if args.output_format == OutputSink.FORMAT_DIR and not args.force:
+        search_index.load()
+    return search_index
+
+
+def watch(project: Project, manifest: Manifest, args,
+        parse_cache: ParseCache | None=None,
+        search_index: SearchIndex | None=None):
+    '''Rebuild when paradocs.xml or the XML files in docdir change, until
+    interrupted. Changed class files are re-parsed alone. A change of
+    paradocs.xml or index.xml reloads the project.'''
+    index_file = os.path.join(project.docdir, 'index.xml')
+
+    def file_hash(path):
+        return Manifest.hash_file(path) if os.path.exists(path) else ''
+
+    hashes = {
+        'paradocs.xml': file_hash('paradocs.xml'),
+        index_file: file_hash(index_file),
+    }
+    watcher = Watcher(['paradocs.xml'], [project.docdir],
+        interval=args.watch_interval)
+    print('Watching for changes. Press Ctrl+C to stop.')
+    try:
+        while True:
+            changed = watcher.wait()
+            reload = False
+            for path in hashes:
+                if path in changed:
+                    new_hash = file_hash(path)
+                    reload = reload or new_hash != hashes[path]
+                    hashes[path] = new_hash
+            try:
+                if reload:
+                    print('Reloading the project...')
+                    project = load_project(args, parse_cache)
+                    # The docdir may have moved.
+                    watcher = Watcher(['paradocs.xml'], [project.docdir],
+                        interval=args.watch_interval)
+                    manifest = Manifest(project.outdir, __version__,
+                        hashes['paradocs.xml'])
+                    manifest.load()
+                    search_index = load_search_index(project, args,
+                        hashes['paradocs.xml'])
+                    project.parse_category_trees(manifest, args.jobs)
+                else:
+                    filenames = set(os.path.basename(path) for path in changed)
+                    classes = project.update_files(filenames)
+                    if len(classes) == 0:
+                        continue
+                # The dependency graph finds the pages of the changed classes
+                # and the pages linking added or removed types.
+                failures = write_pages(project, DirectorySink(project.outdir),
+                    manifest, args.jobs, search_index=search_index,
+                    explain=args.explain)
+            except (ValueError, OSError) + XmlBackend.PARSE_ERRORS as e:
+                # Doxygen may be still writing. Wait for the next change.
+                print(f'Build failed: {e}')
+                continue
+            project.record_summaries(manifest)
+            manifest.save()
+            if search_index is not None:
+                search_index.save()
+            if parse_cache is not None:
+                parse_cache.prune()
+            report_failures(failures)
+    except KeyboardInterrupt:
+        # Also during a rebuild. The manifest of the last finished build
+        # is kept.
+        print()
+
+
+class ServedPages:
+    '''Pages of the project rendered on request. Each page is kept until
+    the XML files it is rendered from change, or a type is added or removed
+    that one of its words could refer to.'''
+    # Seconds between the checks of the files.
+    CHECK_INTERVAL = 0.5
+
+    def __init__(self, args, parse_cache: ParseCache | None=None):
+        self._args = args
+        self._parse_cache = parse_cache
+        self._pages = {} # {"link": "Markdown"}
+        self._names = {} # {"link": set} of the class pages
+        self._checked = 0.0
+        self._load()
+
+    def _load(self):
+        self._project = load_project(self._args, self._parse_cache)
+        self._project.parse_category_trees()
+        self._links = {klass.link: klass for klass in self._project.classes()}
+        self._pages = {}
+        self._names = {}
+        index_file = os.path.join(self._project.docdir, 'index.xml')
+        self._reload_files = ['paradocs.xml', index_file]
+        self._watcher = Watcher(['paradocs.xml'], [self._project.docdir])
+
+    @property
+    def project(self) -> Project:
+        return self._project
+
+    def _check(self):
+        '''Drop the pages of the changed files, and the pages whose words
+        include the last part of an added or removed type. Reload the
+        project if paradocs.xml or index.xml changed.'''
+        now = time.monotonic()
+        if now - self._checked < self.CHECK_INTERVAL:
+            return
+        self._checked = now
+        changed = self._watcher.poll()
+        if len(changed) == 0:
+            return
+        if any(path in changed for path in self._reload_files):
+            print('Reloading the project...')
+            self._load()
+            return
+        filenames = set(os.path.basename(path) for path in changed)
+        types = self._type_names()
+        classes = self._project.update_files(filenames)
+        if len(classes) == 0:
+            return
+        self._pages.pop('index', None)
+        for klass in classes:
+            self._drop(klass.link)
+        parts = set(name.rsplit('::', 1)[-1]
+            for name in types ^ self._type_names())
+        if len(parts) > 0:
+            for link, names in list(self._names.items()):
+                if not parts.isdisjoint(names):
+                    self._drop(link)
+
+    def _type_names(self) -> set:
+        return set(t.name for t in self._project.type_dictionary().types())
+
+    def _drop(self, link):
+        self._pages.pop(link, None)
+        self._names.pop(link, None)
+
+    def render(self, name) -> str | None:
+        '''Markdown of the page, or None if there is no such page.'''
+        self._check()
+        text = self._pages.get(name)
+        if text is not None:
+            return text
+        if name == 'index':
+            text = self._project.index_page()
+        elif name in self._links:
+            out = io.StringIO()
+            self._names[name] = self._project.write_class_page(
+                self._links[name], out)
+            text = out.getvalue()
+        else:
+            return None
+        self._pages[name] = text
+
+        return text
+
+
+def serve(args, parse_cache: ParseCache | None=None):
+    pages = ServedPages(args, parse_cache)
+    server = PageServer(pages.render, pages.project.basepath,
+        port=args.port)
+    print(f'Serving {pages.project.name} at {server.address}'
+        ' (add .html for HTML). Press Ctrl+C to stop.')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='paradocs',
+        description='Generate Markdown documents from Doxygen XML output.')
+    parser.add_argument('--version', action='version',
+        version=f'Paradocs v{__version__}')
+    parser.add_argument('--test', action='store_true',
+        help='print the pages of the example project instead of writing')
+    parser.add_argument('--force', action='store_true',
+        help='ignore the manifest and rebuild every page')
+    parser.add_argument('--explain', action='store_true',
+        help='print why each page is rebuilt')
+    parser.add_argument('--only', action='append', metavar='CLASS',
+        help='write only the page of CLASS. Can be repeated')
+    parser.add_argument('--watch', action='store_true',
+        help='keep running and rebuild when the XML files change')
+    parser.add_argument('--watch-interval', type=float, default=0.5,
+        metavar='SECONDS', help='polling interval of --watch'
+            ' (default: %(default)s)')
+    parser.add_argument('--serve', action='store_true',
+        help='serve the pages over HTTP instead of writing them')
+    parser.add_argument('--port', type=int, default=8000,
+        help='port of --serve (default: %(default)s)')
+    parser.add_argument('--output-format', default=OutputSink.FORMAT_DIR,
+        choices=OutputSink.FORMATS,
+        help='write the pages to outdir, or to one archive'
+            ' (default: %(default)s)')
+    parser.add_argument('-o', '--output', metavar='FILE',
+        help='path of the archive, - for stdout'
+            ' (default: outdir with the suffix of the format)')
+    parser.add_argument('--no-search-index', action='store_true',
+        help='do not write the search index')
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+        help='parse and render in N processes, 0 for one per CPU')
+    parser.add_argument('--streaming', action='store_true',
+        help='parse the XML files incrementally to reduce peak memory')
+    parser.add_argument('--xml-backend', default=XmlBackend.STDLIB,
+        choices=[XmlBackend.STDLIB, XmlBackend.LXML, XmlBackend.AUTO],
+        help='parser of the Doxygen XML files. auto uses lxml if installed'
+            ' and falls back to stdlib (default: %(default)s)')
+    parser.add_argument('--cache', metavar='DIR',
+        help='keep parsed classes in DIR and reuse them in later runs')
+    parser.add_argument('--cache-size', type=int, default=256, metavar='MB',
+        help='size limit of the parse cache (default: %(default)s)')
+    parser.add_argument('--profile', nargs='?', const='paradocs-profile.json',
+        metavar='FILE',
+        help='print time and memory of each stage and save them as JSON to'
+            ' FILE (default: %(const)s). Runs in one process')
+    parser.add_argument('--profile-top', type=int, default=10, metavar='N',
+        help='number of the slowest classes in the profile report')
+
+    if len(argv) > 0 and argv[0] == 'build':
+        parser.prog = 'paradocs build'
+        parser.add_argument('projects', nargs='+', metavar='PARADOCS_XML',
+            help='project files to build in one process')
+        args = parser.parse_args(argv[1:])
+        if args.test or args.serve or args.watch or args.only is not None:
+            parser.error('build cannot be used with --test, --serve,'
+                ' --watch or --only')
+        if args.output is not None:
+            parser.error('build cannot be used with --output. The archives'
+                ' are written next to the outdir of each project')
+    else:
+        args = parser.parse_args(argv)
+        args.projects = None
+    if args.watch and args.only is not None:
+        parser.error('--watch cannot be used with --only')
+    if args.serve and (args.watch or args.only is not None):
+        parser.error('--serve cannot be used with --watch or --only')
+    if args.output_format != OutputSink.FORMAT_DIR and args.watch:
+        parser.error('--watch needs --output-format dir')
+    if args.output is not None and \
+            args.output_format == OutputSink.FORMAT_DIR:
+        parser.error('--output needs an archive --output-format')
+    try:
+        XmlBackend.use(args.xml_backend)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.jobs <= 0:
+        args.jobs = os.cpu_count() or 1
+    if args.profile is not None:
+        args.jobs = 1
+
+    return args
+
+
+def start_profiler() -> Profiler:
+    profiler = Profiler()
+    profiler.instrument(CppCode, 'normalize_param')
+    profiler.instrument(CppCode, 'normalize_template')
+    profiler.instrument(TypeDictionary, 'get_type')
+    profiler.instrument(TypeDictionary, 'find_types')
+    profiler.instrument(TypeLinker, 'link_code')
+    profiler.instrument(PageWriter, 'write')
+    profiler.start()
+
+    return profiler
+
+
+def build_project(args, filename: str='paradocs.xml',
+        parse_cache: ParseCache | None=None,
+        profiler: Profiler | None=None,
+        executor: ProcessPoolExecutor | None=None,
+        stats: dict | None=None, stage_prefix: str=''):
+    '''Parse the project and write its pages, the manifest and the search
+    index. The process pool work runs in the executor if given. Return
+    (project, manifest, search index, failures). Raise ValueError if the
+    project file is invalid, and OSError if the output cannot be opened.'''
+    def stage(name):
+        if profiler is None:
+            return contextlib.nullcontext()
+        return profiler.stage(stage_prefix + name)
+
+    with stage('metadata'):
+        project = load_project(args, parse_cache, profiler, filename)
+    manifest = None
+    search_index = None
+    archive = args.output_format != OutputSink.FORMAT_DIR
+    if args.only is None:
+        project_hash = Manifest.hash_file(filename)
+        if not archive:
+            manifest = Manifest(project.outdir, __version__, project_hash)
+            if args.force:
+                manifest.force()
+            else:
+                manifest.load()
+        search_index = load_search_index(project, args, project_hash)
+    with stage('parse'):
+        project.parse_category_trees(manifest, args.jobs, executor)
+
+    sink = OutputSink.open(args.output_format, project.outdir, args.output)
+    if args.output == '-':
+        # The archive goes to stdout. Print the messages to stderr.
+        sys.stdout = sys.stderr
+    with stage('render and write'), sink:
+        if args.only is not None:
+            failures = write_selected_pages(project, sink, args.only)
+        else:
+            failures = write_pages(project, sink, manifest, args.jobs,
+                search_index=search_index, explain=args.explain,
+                executor=executor, stats=stats)
+    with stage('manifest'):
+        if manifest is not None:
+            project.record_summaries(manifest)
+            manifest.save()
+        if search_index is not None and not archive:
+            search_index.save()
+
+    return project, manifest, search_index, failures
+
+
+def build_batch(args, parse_cache: ParseCache | None=None,
+        profiler: Profiler | None=None) -> bool:
+    '''Build the projects of args.projects in this process, sharing the
+    process pool, the parse cache and the C++ normalizer caches. Print a
+    combined summary. Return True if every project succeeded.'''
+    executor = None
+    if args.jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=args.jobs)
+    rows = [] # [[file, name, classes, written, up to date, failed, seconds]]
+    ok = True
+    try:
+        for filename in args.projects:
+            print(f'Building {filename}...')
+            stats = {}
+            start = time.perf_counter()
+            try:
+                project, _, _, failures = build_project(args, filename,
+                    parse_cache, profiler, executor, stats,
+                    stage_prefix=f'{filename}: ')
+            except (ValueError, OSError) + XmlBackend.PARSE_ERRORS as e:
+                print(f'{filename}: {e}')
+                rows.append([filename, '-', '-', '-', '-', 'error',
+                    time.perf_counter() - start])
+                ok = False
+                continue
+            ok = not report_failures(failures) and ok
+            rows.append([filename, project.name, len(project.classes()),
+                stats.get('written', 0), stats.get('up to date', 0),
+                len(failures), time.perf_counter() - start])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print()
+    print(f'{"Project":<32} {"Name":<16} {"Classes":>7} {"Written":>7}'
+        f' {"Up to date":>10} {"Failed":>6} {"Time (s)":>8}')
+    for filename, name, classes, written, fresh, failed, seconds in rows:
+        print(f'{filename:<32} {name:<16} {classes:>7} {written:>7}'
+            f' {fresh:>10} {failed:>6} {seconds:>8.3f}')
+    total = sum(row[-1] for row in rows)
+    print(f'{len(rows)} project(s) in {total:.3f} s.')
+
+    return ok
+
+
+if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    profiler = None
+    if args.profile is not None and not args.test and not args.serve:
+        profiler = start_profiler()
+
+    parse_cache = None
+    if args.cache is not None:
+        parse_cache = ParseCache(args.cache, __version__,
+            args.cache_size * 1024 * 1024)
+    if args.serve:
+        try:
+            serve(args, parse_cache)
+        except (ValueError,) + XmlBackend.PARSE_ERRORS as e:
+            print(f'paradocs.xml: {e}')
+            exit(1)
+        exit(0)
+
+    if args.test:
+        try:
+            project = load_project(args, parse_cache)
+            project.parse_category_trees()
+        except (ValueError,) + XmlBackend.PARSE_ERRORS as e:
+            print(f'paradocs.xml: {e}')
+            exit(1)
+        print(project.type_dictionary())
+        print(project.index_page())
+        print('---------------------------')
+        print(project.class_page('EnumTest'))
+        print('---------------------------')
+        print(project.class_page('TemplateTest'))
+        print('---------------------------')
+        print(project.class_page('Enclosing::Nested'))
+        print('---------------------------')
+        print(project.class_page('Enclosing'))
+        exit(0)
+
+    if args.projects is not None:
+        ok = build_batch(args, parse_cache, profiler)
+        name = ', '.join(args.projects)
+    else:
+        try:
+            project, manifest, search_index, failures = build_project(args,
+                parse_cache=parse_cache, profiler=profiler)
+        except (ValueError,) + XmlBackend.PARSE_ERRORS as e:
+            print(f'paradocs.xml: {e}')
+            exit(1)
+        except OSError as e:
+            print(f'Cannot open the output: {e}')
+            exit(1)
+        name = project.name
+    if parse_cache is not None:
+        with profiler.stage('cache') if profiler is not None \
+                else contextlib.nullcontext():
+            parse_cache.prune()
+    if profiler is not None:
+        profiler.stop()
+        print()
+        print(profiler.report(args.profile_top))
+        profiler.save(args.profile, {
+            'paradocs': __version__,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'project': name,
+        })
+    if args.projects is not None:
+        exit(0 if ok else 1)
+    if args.watch:
+        project.set_profiler(None)
+        report_failures(failures)
+        watch(project, manifest, args, parse_cache, search_index)
+    elif report_failures(failures):
+        exit(1)
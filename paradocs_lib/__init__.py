@@ -1,8 +1,22 @@
 from .markdown import Markdown
+from .page_writer import PageWriter
+from .output_sink import OutputSink, DirectorySink, ZipSink, TarSink
 from .cpp_code import CppCode
 from .member_type import MemberType
 from .member_function import MemberFunction
 from .type_dictionary import TypeDictionary
+from .type_linker import TypeLinker
 from .xml_helper import Xml
+from .xml_backend import XmlBackend
 from .doxygen_class_xml import DoxygenClassXml
+from .doxygen_class_stream_xml import DoxygenClassStreamXml
+from .doxygen_index import DoxygenIndex
 from .detailed_description import DetailedDescription
+from .manifest import Manifest
+from .search_index import SearchIndex
+from .parse_cache import ParseCache
+from .profiler import Profiler
+from .watcher import Watcher
+from .page_server import PageServer
+
+__version__ = '0.1.0'
@@ -1,60 +1,135 @@
+import functools
 import re
 
 class CppCode:
     '''C++ header code helper class.'''
+    # Words are identifiers, qualified names and numbers. String and char
+    # literals, "...", "&&", "||", "==" and "!=" are one token. Everything
+    # else is a one character token.
+    _TOKEN = re.compile(r'\s+'
+        r'''|(?:u8|[uUL])?(?:"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')'''
+        r'|\.\.\.|(?:[\w:~$]|\.\d)[\w:~$]*(?:\.(?!\.)[\w:~$]*)*'
+        r'|&&|\|\||[=!]=|.')
+    # Spaced when they follow an operand. "*" and "&" are declarators.
+    _BINARY_OPERATORS = ('+', '-', '/', '%', '^', '|', '||', '==', '!=')
+
+    @staticmethod
+    def tokenize(code) -> list:
+        '''Split the code into tokens. Whitespace is dropped.'''
+        tokens = []
+        for m in CppCode._TOKEN.finditer(code):
+            token = m.group()
+            if not token.isspace():
+                tokens.append(token)
+        return tokens
+
+    @staticmethod
+    def _is_word(token) -> bool:
+        '''True for words and literals.'''
+        return token[0].isalnum() or token[0] in '_:~.$"\''
+
+    @staticmethod
+    def _is_operand(token) -> bool:
+        return CppCode._is_word(token) or token in (')', ']')
+
+    @staticmethod
+    def _separator(prev, token, before=None, following=None) -> str:
+        '''Whitespace between two adjacent tokens. before is the token
+        before prev and following the token after token, or None.'''
+        if token == '(' and CppCode._is_word(prev) and following is not None \
+                and (following in ('*', '&', '&&') or following.endswith('::')):
+            # Declarator in parentheses. e.g. "void (*fp)(int)".
+            return ' '
+        if prev == '=' or token == '=':
+            return ' '
+        if token in CppCode._BINARY_OPERATORS and CppCode._is_operand(prev):
+            return ' '
+        if prev in CppCode._BINARY_OPERATORS and before is not None and \
+                CppCode._is_operand(before):
+            return ' '
+        if token == '...':
+            # Pack expansion. e.g. "Args&&... args".
+            return ' ' if prev == ',' else ''
+        if token in (',', '<', '>', '(', ')', '[', ']', '&', '&&'):
+            return ''
+        if prev in ('<', '(', '['):
+            return ''
+        if token.startswith('::') and prev in ('>', ')'):
+            # Nested name of a template or decltype. e.g. "Foo<T>::Bar".
+            return ''
+        if token == '*':
+            return '' if prev == '*' or prev.endswith('::') else ' '
+        if prev == '*':
+            return ''
+        if CppCode._is_word(token):
+            if CppCode._is_word(prev):
+                return ' '
+            if prev in ('&', '&&'):
+                # e.g. "int (&arr)[3]", "int *p = &x".
+                return '' if before in ('(', '=') else ' '
+            if prev in (',', '>', ')', ']'):
+                return ' '
+        return ''
+
+    @staticmethod
+    def format_tokens(tokens) -> str:
+        '''Join the tokens in Paradocs style. e.g. "const Foo<T, U>& name",
+        "const char *name".
+
+        >>> f = lambda code: CppCode.format_tokens(CppCode.tokenize(code))
+        >>> f('const std::vector< std::pair< int, Foo > > &v')
+        'const std::vector<std::pair<int, Foo>>& v'
+        >>> f('typename std::vector< T >::iterator it')
+        'typename std::vector<T>::iterator it'
+        >>> f('const ::Foo &foo')
+        'const ::Foo& foo'
+        >>> f('void (Foo::*pm)()')
+        'void (Foo::*pm)()'
+        >>> f('int (&arr)[3]')
+        'int (&arr)[3]'
+        >>> f('std::function< void(int32_t)> callback')
+        'std::function<void(int32_t)> callback'
+        >>> f('const Foo< T > &foo = Foo< T >()')
+        'const Foo<T>& foo = Foo<T>()'
+        >>> f('int n = -1')
+        'int n = -1'
+        >>> f('int n = 1 + 2')
+        'int n = 1 + 2'
+        >>> f('const String &sep = ", "')
+        'const String& sep = ", "'
+        >>> f('const String & sep ", "')
+        'const String& sep ", "'
+        >>> f("char c = ' '")
+        "char c = ' '"
+        >>> f('const char *fmt = "%d (x)"')
+        'const char *fmt = "%d (x)"'
+        >>> f('int *p = &x')
+        'int *p = &x'
+        >>> f('Args &&... args')
+        'Args&&... args'
+        >>> f('double x = .5')
+        'double x = .5'
+        '''
+        parts = []
+        for i, token in enumerate(tokens):
+            if i > 0:
+                before = tokens[i - 2] if i > 1 else None
+                following = tokens[i + 1] if i + 1 < len(tokens) else None
+                parts.append(CppCode._separator(tokens[i - 1], token, before,
+                    following))
+            parts.append(token)
+        return ''.join(parts)
+
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def normalize_template(code):
-        reg_type = '([^< ]+) *<(.+)>'
-        reg_brackets = '<(.+)>'
-
-        code = code.strip()
-        if code.startswith('<'):
-            m = re.search(reg_brackets, code)
-            return '<' + CppCode.normalize_template(m.groups()[0]) + '>'
-        else:
-            m = re.search(reg_type, code)
-            if m is None:
-                return code
-            origin = m.groups()[0].strip()
-            return origin + '<' + CppCode.normalize_template(m.groups()[1]) + '>'
+        '''Remove the spaces inside template brackets.
+        e.g. "std::map< K, V >" to "std::map<K, V>".'''
+        return CppCode.format_tokens(CppCode.tokenize(code))
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def normalize_param(code):
-        reg_full = '(const)? *([^& ]+) *(&)? *([\*]+)? *(.+)'
-        reg_template = '(<.+>)'
-
-        code = code.strip()
-        template_m = re.search(reg_template, code)
-        template_brackets = ''
-        is_template = False
-        if template_m is not None:
-            template_brackets = template_m.groups()[0]
-            code = code.replace(template_brackets, '')
-            template_brackets = CppCode.normalize_template(template_brackets)
-            is_template = True
-        m = re.search(reg_full, code)
-        print(m.groups())
-        is_const = m.groups()[0] is not None
-        plain_type = m.groups()[1]
-        is_ref = m.groups()[2] is not None
-        is_ptr = m.groups()[3] is not None
-        param_name = m.groups()[4]
-
-        normalized = ''
-        if is_const:
-            normalized += 'const '
-        if is_template:
-            print(' - plain_type: "' + plain_type + '"')
-            normalized += plain_type + template_brackets
-        else:
-            normalized += plain_type
-        if is_ref:
-            normalized += '& '
-        if is_ptr:
-            normalized += ' *'
-        if is_ref or is_ptr:
-            normalized += param_name
-        else:
-            normalized += ' ' + param_name
-
-        return normalized
+        '''Normalize a parameter declaration.
+        e.g. "const Foo< T > &foo" to "const Foo<T>& foo".'''
+        return CppCode.format_tokens(CppCode.tokenize(code))
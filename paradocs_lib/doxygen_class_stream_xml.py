@@ -0,0 +1,66 @@
+from .doxygen_class_xml import DoxygenClassXml
+from .xml_backend import XmlBackend
+
+
+class DoxygenClassStreamXml(DoxygenClassXml):
+    '''Same interface as `DoxygenClassXml`, but the file is read with
+    `XmlBackend.iterparse`. Each <memberdef> is converted when its end tag is read
+    and then cleared, so peak memory does not grow with the file size.'''
+    # Depths of the elements. <doxygen> is 1.
+    _COMPOUND_CHILD_DEPTH = 3
+    _MEMBERDEF_DEPTH = 4
+
+    def _parse(self):
+        depth = 0
+        # Only the first section of each kind is read.
+        section_kinds = set()
+        section = None
+        for event, elem in XmlBackend.iterparse(self._filename,
+                events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == self._COMPOUND_CHILD_DEPTH and elem.tag == 'sectiondef':
+                    kind = elem.attrib.get('kind')
+                    section = kind if kind not in section_kinds else None
+                    section_kinds.add(kind)
+                continue
+
+            if depth == self._MEMBERDEF_DEPTH and elem.tag == 'memberdef':
+                if section is not None:
+                    self._read_memberdef(elem, section)
+                elem.clear()
+            elif depth == self._COMPOUND_CHILD_DEPTH:
+                if elem.tag == 'sectiondef':
+                    section = None
+                else:
+                    self._read_compound_child(elem)
+                elem.clear()
+            depth -= 1
+
+    @staticmethod
+    def public_enum_names(filename) -> list:
+        '''Names of the enums in the first public-type section, read without
+        building the members. Stops at the end of the section.'''
+        names = []
+        depth = 0
+        in_section = False
+        for event, elem in XmlBackend.iterparse(filename,
+                events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == DoxygenClassStreamXml._COMPOUND_CHILD_DEPTH and \
+                        elem.tag == 'sectiondef':
+                    in_section = elem.attrib.get('kind') == 'public-type'
+                continue
+
+            if depth == DoxygenClassStreamXml._MEMBERDEF_DEPTH and \
+                    elem.tag == 'memberdef':
+                if in_section and elem.attrib.get('kind') == 'enum':
+                    names.append(elem.findtext('name'))
+                elem.clear()
+            elif depth == DoxygenClassStreamXml._COMPOUND_CHILD_DEPTH and \
+                    elem.tag == 'sectiondef' and in_section:
+                break
+            depth -= 1
+
+        return names
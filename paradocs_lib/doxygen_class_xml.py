@@ -3,6 +3,7 @@ import xml.etree.ElementTree as ET
 from typing import List
 
 from .xml_helper import Xml
+from .xml_backend import XmlBackend
 from .member_function import MemberFunction
 from .cpp_code import CppCode
 from .member_type import MemberType
@@ -12,7 +13,56 @@ class DoxygenClassXml:
     def __init__(self, namespace, filename):
         self._namespace = namespace
         self._filename = filename
-        self._tree_root = ET.parse(filename).getroot()
+
+        self._compound_name = ''
+        self._brief = ''
+        self._template_params = None
+        self._member_functions: List[MemberFunction] = []
+        self._alias_types: List[MemberType] = []
+        self._enums: List[MemberType] = []
+
+        self._parse()
+        DoxygenClassXml.set_overloading_indices(self._member_functions)
+
+    def _parse(self):
+        '''Read everything from <compounddef> in one pass.'''
+        compounddef = XmlBackend.parse(self._filename)[0]
+        # Only the first section of each kind is read.
+        section_kinds = set()
+        for child in compounddef:
+            if child.tag == 'sectiondef':
+                kind = child.attrib.get('kind')
+                if kind in section_kinds:
+                    continue
+                section_kinds.add(kind)
+                for memberdef in child:
+                    if memberdef.tag == 'memberdef':
+                        self._read_memberdef(memberdef, kind)
+            else:
+                self._read_compound_child(child)
+
+    def _read_compound_child(self, elem: ET.Element):
+        '''Read a child of <compounddef> other than <sectiondef>.'''
+        if elem.tag == 'compoundname':
+            self._compound_name = elem.text
+        elif elem.tag == 'briefdescription':
+            self._brief = DoxygenClassXml.compound_brief(elem)
+        elif elem.tag == 'templateparamlist':
+            if self._template_params is None:
+                self._template_params = DoxygenClassXml.template_params(elem)
+
+    def _read_memberdef(self, memberdef: ET.Element, section):
+        '''Read a <memberdef> in the <sectiondef> of the kind section.'''
+        kind = memberdef.attrib.get('kind')
+        if section == 'public-func':
+            self._member_functions.append(
+                DoxygenClassXml.member_function(memberdef, self.class_name()))
+        elif section == 'public-type' and kind == 'typedef':
+            self._alias_types.append(
+                DoxygenClassXml.member_alias_type(memberdef, self.class_name()))
+        elif section == 'public-type' and kind == 'enum':
+            self._enums.append(
+                DoxygenClassXml.member_enum(memberdef, self.class_name()))
 
     @staticmethod
     def _get_text(tree):
@@ -37,8 +87,8 @@ class DoxygenClassXml:
     @staticmethod
     def template_param(param_tree):
         text = ''
-        text += Xml.plain_text(Xml.find_tag(param_tree, 'type'))
-        declname = Xml.find_tag(param_tree, 'declname')
+        text += Xml.plain_text(Xml.find_tag_direct(param_tree, 'type'))
+        declname = Xml.find_tag_direct(param_tree, 'declname')
         if declname is not None:
             text += ' ' + Xml.plain_text(declname)
 
@@ -47,64 +97,23 @@ class DoxygenClassXml:
     @staticmethod
     def description_text(tree: ET.Element) -> str:
         '''Get plain text from tree. Keep backticks.'''
-        text = tree.text or ''
-        text = text.lstrip()
-        for child in tree:
-            if child.tag == 'computeroutput':
-                text += f'`{Xml.plain_text(child)}`'
-            else:
-                text += DoxygenClassXml.description_text(child)
-            text += child.tail or ''
-        text = text.strip()
-
-        return text
+        return Xml.join_text(tree, (), 'computeroutput')
 
     @staticmethod
     def description_text_exclude(tree: ET.Element, exclude) -> str:
         '''Get text from tree. Keep backticks. Exclude tags.'''
-        text = tree.text or ''
-        text = text.lstrip()
-        for child in tree:
-            if child.tag in exclude:
-                pass
-            else:
-                if child.tag == 'computeroutput':
-                    text += f'`{Xml.plain_text(child)}`'
-                else:
-                    text += DoxygenClassXml.description_text_exclude(
-                        child, exclude)
-            text += child.tail or ''
-        return text.strip()
+        return Xml.join_text(tree, exclude, 'computeroutput')
 
-    def class_name(self, prepend_namespace=False):
-        root = self._tree_root
-        compounddef = root[0]
-        compoundname = Xml.find_tag(compounddef, 'compoundname')
-        name = compoundname.text
-        if prepend_namespace is False:
-            name = name.replace(f'{self._namespace}::', '')
-
-        return name
-
-    def class_brief(self):
-        root = self._tree_root
-        compounddef = root[0]
-        briefdescription = None
-        for child in compounddef:
-            if child.tag == 'briefdescription':
-                briefdescription = child
+    @staticmethod
+    def compound_brief(briefdescription: ET.Element) -> str:
+        '''Text of the compound <briefdescription> tag.'''
         if len(briefdescription) == 0:
             return ''
-        return self._parse_para(briefdescription[0])
-
-    def class_template_params(self):
-        '''None if not a template class.'''
-        root = self._tree_root
-        compounddef = root[0]
-        templateparamlist = Xml.find_tag(compounddef, 'templateparamlist')
-        if templateparamlist is None:
-            return None
+        return DoxygenClassXml._parse_para(briefdescription[0])
 
+    @staticmethod
+    def template_params(templateparamlist: ET.Element) -> List[str]:
+        '''List of the params in <templateparamlist> tag.'''
         param_tags = Xml.filter_tags(templateparamlist, 'param')
         l = []
         for param_tag in param_tags:
@@ -112,121 +121,123 @@ class DoxygenClassXml:
 
         return l
 
-    def class_member_functions(self) -> List[MemberFunction]:
-        '''List of `MemberFunction`.'''
-        root = self._tree_root
-        compounddef = root[0]
-        # Find <sectiondef kind="public-func">.
-        sectiondef_tags = Xml.filter_tags(compounddef, 'sectiondef',
-            {'kind': 'public-func'})
-        if len(sectiondef_tags) == 0:
-            return []
-        public_func = sectiondef_tags[0]
+    @staticmethod
+    def member_function(memberdef: ET.Element,
+            class_name: str) -> MemberFunction:
+        '''Build `MemberFunction` from <memberdef kind="function"> tag.
+        Overloading index is not set.'''
+        attributes = memberdef.attrib
+        name = Xml.find_tag_direct(memberdef, 'name').text
+        type_tag = Xml.find_tag_direct(memberdef, 'type')
+        ret_type = Xml.plain_text(type_tag).strip()
+        # Check if template.
+        template_params = []
+        templateparamlist = Xml.find_tag_direct(memberdef,
+            'templateparamlist')
+        if templateparamlist is not None:
+            for param in templateparamlist:
+                p = DoxygenClassXml.template_param(param)
+                template_params.append(p)
+        # Get <param> tags.
+        param_tags = Xml.filter_tags(memberdef, 'param')
+        args = []
+        for param in param_tags:
+            arg_str = Xml.plain_text(param).strip()
+            arg_str = arg_str.replace('\n', '')
+            arg_str = CppCode.normalize_param(arg_str)
+            args.append(arg_str)
+
+        # Get brief and detail descriptions.
+        brief = Xml.find_tag_direct(memberdef, 'briefdescription')
+        brief = DoxygenClassXml.description_text(brief)
+        detail = Xml.find_tag_direct(memberdef, 'detaileddescription')
+        detail = DoxygenClassXml.description_text(detail)
+
+        member_func = MemberFunction(class_name, name, ret_type, args)
+        if attributes['const'] == 'yes':
+            member_func.set_const(True)
+        if len(template_params) > 0:
+            member_func.set_template_params(template_params)
+        member_func.set_brief(brief)
+        member_func.set_detail(detail)
+
+        return member_func
 
+    @staticmethod
+    def set_overloading_indices(member_funcs: List[MemberFunction]):
+        '''Number the consecutive functions with the same name.'''
         prev_func = None
-        member_funcs = []
-        for memberdef in public_func:
-            attributes = memberdef.attrib
-            class_name = self.class_name()
-            name = Xml.find_tag_direct(memberdef, 'name').text
-            type_tag = Xml.find_tag_direct(memberdef, 'type')
-            ret_type = Xml.plain_text(type_tag).strip()
-            # Check if template.
-            template_params = []
-            templateparamlist = Xml.find_tag(memberdef, 'templateparamlist')
-            if templateparamlist is not None:
-                for param in templateparamlist:
-                    p = DoxygenClassXml.template_param(param)
-                    template_params.append(p)
-            # Get <param> tags.
-            param_tags = Xml.filter_tags(memberdef, 'param')
-            args = []
-            for param in param_tags:
-                arg_str = Xml.plain_text(param).strip()
-                arg_str = arg_str.replace('\n', '')
-                arg_str = CppCode.normalize_param(arg_str)
-                args.append(arg_str)
-
-            # Get brief and detail descriptions.
-            brief = Xml.filter_tags(memberdef, 'briefdescription')[0]
-            brief = DoxygenClassXml.description_text(brief)
-            detail = Xml.filter_tags(memberdef, 'detaileddescription')[0]
-            detail = DoxygenClassXml.description_text(detail)
-
-            member_func = MemberFunction(class_name, name, ret_type, args)
-            if attributes['const'] == 'yes':
-                member_func.set_const(True)
-            if len(template_params) > 0:
-                member_func.set_template_params(template_params)
-            member_func.set_brief(brief)
-            member_func.set_detail(detail)
-            # Check overloading.
+        for member_func in member_funcs:
             if prev_func is not None:
                 if prev_func.name == member_func.name:
                     member_func.set_overloading_index(prev_func.overloading_index + 1)
-            member_funcs.append(member_func)
-
             prev_func = member_func
 
-        return member_funcs
+    @staticmethod
+    def member_alias_type(memberdef: ET.Element,
+            class_name: str) -> MemberType:
+        '''Build `MemberType` from <memberdef kind="typedef"> tag.'''
+        target_type = Xml.plain_text(Xml.find_tag_direct(memberdef, 'type'))
+        name = Xml.plain_text(Xml.find_tag_direct(memberdef, 'name'))
+        member_type = MemberType(class_name, name, MemberType.KIND_ALIAS)
+        member_type.set_type(target_type)
+
+        return member_type
+
+    @staticmethod
+    def member_enum(memberdef: ET.Element, class_name: str) -> MemberType:
+        '''Build `MemberType` from <memberdef kind="enum"> tag.'''
+        enum_values = []
+        enum_name = Xml.plain_text(Xml.find_tag_direct(memberdef, 'name'))
+        enumvalue_list = Xml.filter_tags(memberdef, 'enumvalue')
+        for enumvalue in enumvalue_list:
+            name = Xml.plain_text(Xml.find_tag_direct(enumvalue, 'name'))
+            brief = Xml.plain_text(
+                Xml.find_tag_direct(enumvalue, 'briefdescription'))
+            detail = Xml.plain_text(
+                Xml.find_tag_direct(enumvalue, 'detaileddescription'))
+            enum_value = {
+                'name': name,
+                'brief': brief.strip(),
+                'detail': detail.strip(),
+            }
+            enum_values.append(enum_value)
+        enum_brief = Xml.plain_text(
+            Xml.find_tag_direct(memberdef, 'briefdescription'))
+        enum_detail = Xml.plain_text(
+            Xml.find_tag_direct(memberdef, 'detaileddescription'))
+        enum = MemberType(class_name, enum_name, MemberType.KIND_ENUM)
+        enum.set_enum_values(enum_values)
+        enum.set_brief(enum_brief)
+        enum.set_detail(enum_detail)
+
+        return enum
+
+    def class_name(self, prepend_namespace=False):
+        name = self._compound_name
+        if prepend_namespace is False:
+            name = name.replace(f'{self._namespace}::', '')
+
+        return name
+
+    def class_brief(self):
+        return self._brief
+
+    def class_template_params(self):
+        '''None if not a template class.'''
+        if self._template_params is None:
+            return None
+        return list(self._template_params)
+
+    def class_member_functions(self) -> List[MemberFunction]:
+        '''List of `MemberFunction`.'''
+        return list(self._member_functions)
 
     def member_alias_types(self) -> List[MemberType]:
-        root = self._tree_root
-        compounddef = root[0]
-        public_type = Xml.filter_tags(compounddef, 'sectiondef', {
-            'kind': 'public-type',
-        })
-        if len(public_type) == 0:
-            return []
-        public_type = public_type[0]
-        memberdef_typedef_list = Xml.filter_tags(public_type, 'memberdef', {
-            'kind': 'typedef',
-        })
-        ret = []
-        for memberdef in memberdef_typedef_list:
-            target_type = Xml.plain_text(Xml.find_tag(memberdef, 'type'))
-            name = Xml.plain_text(Xml.find_tag(memberdef, 'name'))
-            member_type = MemberType(self.class_name(), name, MemberType.KIND_ALIAS)
-            member_type.set_type(target_type)
-            ret.append(member_type)
-        return ret
+        return list(self._alias_types)
 
     def member_enums(self) -> List[MemberType]:
-        root = self._tree_root
-        compounddef = root[0]
-        public_type = Xml.filter_tags(compounddef, 'sectiondef', {
-            'kind': 'public-type',
-        })
-        if len(public_type) == 0:
-            return []
-        public_type = public_type[0]
-        memberdef_enum_list = Xml.filter_tags(public_type,
-            'memberdef', { 'kind': 'enum', })
-        ret = []
-        for memberdef in memberdef_enum_list:
-            enum_values = []
-            enum_name = Xml.plain_text(Xml.find_tag(memberdef, 'name'))
-            enumvalue_list = Xml.filter_tags(memberdef, 'enumvalue')
-            for enumvalue in enumvalue_list:
-                name = Xml.plain_text(Xml.find_tag(enumvalue, 'name'))
-                brief = Xml.plain_text(
-                    Xml.find_tag(enumvalue, 'briefdescription'))
-                detail = Xml.plain_text(
-                    Xml.find_tag(enumvalue, 'detaileddescription'))
-                enum_value = {
-                    'name': name,
-                    'brief': brief.strip(),
-                    'detail': detail.strip(),
-                }
-                enum_values.append(enum_value)
-            enum_brief = Xml.plain_text(Xml.filter_tags(memberdef, 'briefdescription')[0])
-            enum_detail = Xml.plain_text(Xml.filter_tags(memberdef, 'detaileddescription')[0])
-            enum = MemberType(self.class_name(), enum_name, MemberType.KIND_ENUM)
-            enum.set_enum_values(enum_values)
-            enum.set_brief(enum_brief)
-            enum.set_detail(enum_detail)
-            ret.append(enum)
-        return ret
+        return list(self._enums)
 
     def member_types(self):
         return self.member_alias_types() + self.member_enums()
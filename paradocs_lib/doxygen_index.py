@@ -0,0 +1,89 @@
+from typing import Dict, List
+
+from .xml_backend import XmlBackend
+
+
+class DoxygenIndex:
+    '''Compounds listed in Doxygen's index.xml.
+
+    The file is read in one streaming pass. Of the members, only the names
+    of enums are kept.
+    '''
+    CLASS_KINDS = ('class', 'struct')
+
+    class Compound:
+        def __init__(self, name: str, refid: str, kind: str, enums=None):
+            self._name = name
+            self._refid = refid
+            self._kind = kind
+            self._enums = enums or []
+
+        @property
+        def name(self) -> str:
+            '''Fully qualified name with namespace.'''
+            return self._name
+
+        @property
+        def refid(self) -> str:
+            return self._refid
+
+        @property
+        def kind(self) -> str:
+            return self._kind
+
+        @property
+        def file(self) -> str:
+            '''Compound XML file name.'''
+            return self._refid + '.xml'
+
+        @property
+        def enums(self) -> List[str]:
+            '''Names of the member enums, without the compound name.'''
+            return self._enums
+
+    def __init__(self, filename):
+        self._filename = filename
+        self._compounds: Dict[str, DoxygenIndex.Compound] = {}
+        self._order: List[DoxygenIndex.Compound] = []
+
+        self._parse()
+
+    def _parse(self):
+        depth = 0
+        enums = []
+        for event, elem in XmlBackend.iterparse(self._filename,
+                events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            # Depth of the parent. <doxygenindex> is 1.
+            if depth == 2 and elem.tag == 'member':
+                if elem.attrib.get('kind') == 'enum':
+                    enums.append(elem.findtext('name'))
+                elem.clear()
+            elif depth == 1 and elem.tag == 'compound':
+                name = elem.findtext('name')
+                compound = DoxygenIndex.Compound(name,
+                    elem.attrib['refid'], elem.attrib['kind'], enums)
+                self._compounds.setdefault(name, compound)
+                self._order.append(compound)
+                enums = []
+                elem.clear()
+
+    def find(self, full_name) -> 'DoxygenIndex.Compound | None':
+        '''Compound of the fully qualified name, or None.'''
+        return self._compounds.get(full_name)
+
+    def class_names(self, namespace) -> List[str]:
+        '''Names without namespace of the classes in the namespace, in the
+        order of the index.'''
+        prefix = f'{namespace}::' if namespace != '' else ''
+        ret = []
+        for compound in self._order:
+            if compound.kind not in DoxygenIndex.CLASS_KINDS:
+                continue
+            if not compound.name.startswith(prefix):
+                continue
+            ret.append(compound.name[len(prefix):])
+        return ret
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+
+
+class Manifest:
+    '''Content hashes of the inputs and outputs of the last build.
+
+    The manifest is stored in the output directory. It is discarded as a
+    whole when the Paradocs version or the project file has changed.
+
+    It also keeps the dependency graph of the pages: the input files of
+    each page with their hashes, and the names the page looked up in the
+    type dictionary. A page is out of date when one of its files changed,
+    or when a type was added or removed that one of its names could refer
+    to. A name is looked up part by part, so it can only find a type at
+    one of its parts that is the last part of the type name.
+    '''
+    FILENAME = '.paradocs-manifest.json'
+
+    def __init__(self, outdir, version, project_hash):
+        self._outdir = outdir
+        self._version = version
+        self._project_hash = project_hash
+        # Entries of the previous build.
+        self._old_classes = {}
+        self._old_pages = {}
+        self._old_types = set()
+        # Why there are no previous entries.
+        self._reset_reason = 'not built before'
+        # Entries of the current build.
+        self._classes = {} # {"Name": {"hash": str, "summary": {...}}}
+        # {"name.md": {"files": {"file": str}, "names": [str], "hash": str}}
+        # or {"file": {"inputs": str, "hash": str}}
+        self._pages = {}
+        self._types = set()
+        # {"last part": "type Name added"} of the types added or removed.
+        self._changed_parts = {}
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return Manifest.hash_bytes(text.encode('utf-8'))
+
+    @staticmethod
+    def hash_file(path) -> str:
+        with open(path, 'rb') as f:
+            return Manifest.hash_bytes(f.read())
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self._outdir, Manifest.FILENAME)
+
+    def load(self):
+        '''Load the previous manifest if it is usable for this build.'''
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != self._version:
+            self._reset_reason = 'Paradocs version changed'
+            return
+        if data.get('project') != self._project_hash:
+            self._reset_reason = 'project file changed'
+            return
+        self._old_classes = data.get('classes', {})
+        self._old_pages = data.get('pages', {})
+        self._old_types = set(data.get('types', []))
+
+    def force(self):
+        '''Do not use the previous build.'''
+        self._old_classes = {}
+        self._old_pages = {}
+        self._old_types = set()
+        self._reset_reason = 'forced'
+
+    def save(self):
+        '''Save the current build, which is the previous build from now.'''
+        data = {
+            'version': self._version,
+            'project': self._project_hash,
+            'classes': self._classes,
+            'pages': self._pages,
+            'types': sorted(self._types),
+        }
+        os.makedirs(self._outdir, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        self._old_classes = dict(self._classes)
+        self._old_pages = dict(self._pages)
+        self._old_types = set(self._types)
+
+    def class_summary(self, class_name, file_hash):
+        '''Summary recorded for the class, or None if the file changed.'''
+        entry = self._old_classes.get(class_name)
+        if entry is None or entry['hash'] != file_hash:
+            return None
+        return entry['summary']
+
+    def set_class_summary(self, class_name, file_hash, summary):
+        self._classes[class_name] = {
+            'hash': file_hash,
+            'summary': summary,
+        }
+
+    def set_types(self, type_names):
+        '''Record the full names of the types of this build, and compare
+        them with the previous build.'''
+        self._types = set(type_names)
+        self._changed_parts = {}
+        for name, change in \
+                [(name, 'added') for name in self._types - self._old_types] + \
+                [(name, 'removed') for name in self._old_types - self._types]:
+            part = name.rsplit('::', 1)[-1]
+            self._changed_parts.setdefault(part, f'type {name} {change}')
+
+    def page_stale_reason(self, filename, files: dict) -> str | None:
+        '''Why the page must be rebuilt, or None if it is up to date. files
+        is {"file": hash} of the input files of the page.'''
+        entry = self._old_pages.get(filename)
+        if entry is None:
+            return self._reset_reason
+        old_files = entry.get('files')
+        if old_files is None:
+            return 'dependencies unknown'
+        for file, file_hash in files.items():
+            old_hash = old_files.get(file)
+            if old_hash is None:
+                return f'{file} added'
+            if old_hash != file_hash:
+                return f'{file} changed'
+        for file in old_files:
+            if file not in files:
+                return f'{file} removed'
+        for name in entry['names']:
+            reason = self._changed_parts.get(name)
+            if reason is not None:
+                return reason
+        if not self._output_unchanged(filename, entry['hash']):
+            return 'output file changed'
+        self._pages[filename] = entry
+
+        return None
+
+    def set_page_dependencies(self, filename, files: dict, names,
+            output_hash):
+        '''Record the page with its input files and the names it looked
+        up.'''
+        self._pages[filename] = {
+            'files': files,
+            'names': sorted(names),
+            'hash': output_hash,
+        }
+
+    def _output_unchanged(self, filename, output_hash) -> bool:
+        try:
+            return Manifest.hash_file(
+                os.path.join(self._outdir, filename)) == output_hash
+        except OSError:
+            return False
+
+    def is_page_fresh(self, filename, inputs_hash) -> bool:
+        '''True if the page was built from the same inputs and the file
+        in the output directory is still the one that was written.'''
+        entry = self._old_pages.get(filename)
+        if entry is None or entry.get('inputs') != inputs_hash:
+            return False
+        if not self._output_unchanged(filename, entry['hash']):
+            return False
+        self._pages[filename] = entry
+
+        return True
+
+    def set_page(self, filename, inputs_hash, output_hash):
+        self._pages[filename] = {
+            'inputs': inputs_hash,
+            'hash': output_hash,
+        }
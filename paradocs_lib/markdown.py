@@ -1,15 +1,128 @@
+import html
+import io
+import re
+
+
 class Markdown:
     '''Markdown helper class.'''
+    # Raw HTML written by the renderer.
+    _HTML_HEADING = re.compile(r'<h3 id="([^"]*)">(.*)</h3>$')
+    _BOLD = re.compile(r'\*\*(.+?)\*\*')
+    _LINK = re.compile(r'\[([^\]]*)\]\(([^)\s]*)\)')
+    # <a> tags of the raw HTML headings, after escaping.
+    _HTML_LINK = re.compile(r'&lt;a href=&quot;(.*?)&quot;&gt;(.*?)&lt;/a&gt;')
+
     @staticmethod
     def table(head, data) -> str:
         '''head: [str, str], data: [[str, str]...]'''
-        txt = f'| {head[0]} | {head[1]} |\n'
-        txt += '|-----------|-----------|\n'
-        for pair in data:
-            txt += f'| {pair[0]} | {pair[1]} |\n'
+        out = io.StringIO()
+        Markdown.write_table(out, head, data)
+        return out.getvalue()
 
-        return txt
+    @staticmethod
+    def write_table(out, head, data):
+        '''Write the table to out. data can be any iterable of pairs.'''
+        out.write(f'| {head[0]} | {head[1]} |\n')
+        out.write('|-----------|-----------|\n')
+        for pair in data:
+            out.write(f'| {pair[0]} | {pair[1]} |\n')
 
     @staticmethod
     def link(text, link) -> str:
         return f'[{text}]({link})'
+
+    @staticmethod
+    def to_html(text, link=None) -> str:
+        '''Convert the Markdown written by Paradocs to HTML for previews.
+        Only headings, tables, lists, fenced code and paragraphs are
+        supported. link maps the URLs of links if given.'''
+        out = io.StringIO()
+        paragraph = []
+        table = []
+        items = []
+
+        def flush():
+            if len(paragraph) > 0:
+                out.write('<p>' + ' '.join(paragraph) + '</p>\n')
+                paragraph.clear()
+            if len(table) > 0:
+                out.write('<table>\n')
+                for i, row in enumerate(table):
+                    if i == 1 and set(''.join(row)) <= set('-: '):
+                        continue
+                    tag = 'th' if i == 0 else 'td'
+                    cells = ''.join(f'<{tag}>{cell}</{tag}>' for cell in row)
+                    out.write(f'<tr>{cells}</tr>\n')
+                out.write('</table>\n')
+                table.clear()
+            if len(items) > 0:
+                out.write('<ul>\n')
+                for item in items:
+                    out.write(f'<li>{item}</li>\n')
+                out.write('</ul>\n')
+                items.clear()
+
+        lines = iter(text.splitlines())
+        for line in lines:
+            stripped = line.strip()
+            if stripped.startswith('```'):
+                flush()
+                code = []
+                for code_line in lines:
+                    if code_line.strip().startswith('```'):
+                        break
+                    code.append(html.escape(code_line))
+                out.write('<pre><code>' + '\n'.join(code) + '</code></pre>\n')
+            elif stripped == '':
+                flush()
+            elif stripped.startswith('#'):
+                flush()
+                level = len(stripped) - len(stripped.lstrip('#'))
+                content = Markdown._inline_html(stripped[level:].strip(), link)
+                out.write(f'<h{level}>{content}</h{level}>\n')
+            elif Markdown._HTML_HEADING.match(stripped) is not None:
+                flush()
+                match = Markdown._HTML_HEADING.match(stripped)
+                content = Markdown._heading_html(match.group(2), link)
+                out.write(f'<h3 id="{match.group(1)}">{content}</h3>\n')
+            elif stripped.startswith('|'):
+                cells = stripped.strip('|').split('|')
+                table.append([Markdown._inline_html(cell.strip(), link)
+                    for cell in cells])
+            elif stripped.startswith('- '):
+                items.append(Markdown._inline_html(stripped[2:], link))
+            else:
+                paragraph.append(Markdown._inline_html(stripped, link))
+        flush()
+
+        return out.getvalue()
+
+    @staticmethod
+    def _heading_html(text, link=None) -> str:
+        '''Raw HTML heading content escaped, except its links.'''
+        def anchor(match):
+            url = html.unescape(match.group(1))
+            if link is not None:
+                url = link(url)
+            return f'<a href="{html.escape(url)}">{match.group(2)}</a>'
+        return Markdown._HTML_LINK.sub(anchor, html.escape(text))
+
+    @staticmethod
+    def _inline_html(text, link=None) -> str:
+        '''Code spans, bold and links of the text as HTML.'''
+        parts = text.split('`')
+        for i, part in enumerate(parts):
+            if i % 2 == 1 and i < len(parts) - 1:
+                parts[i] = '<code>' + html.escape(part) + '</code>'
+                continue
+            part = part.replace('\\<', '<').replace('\\>', '>')
+            part = html.escape(part)
+            part = Markdown._BOLD.sub(r'<strong>\1</strong>', part)
+
+            def anchor(match):
+                url = match.group(2)
+                if link is not None:
+                    url = link(html.unescape(url))
+                return f'<a href="{html.escape(url)}">{match.group(1)}</a>'
+            parts[i] = Markdown._LINK.sub(anchor, part)
+        return ''.join(parts)
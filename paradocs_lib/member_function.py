@@ -1,16 +1,29 @@
+import sys
+
 from typing import List
 
 from .markdown import Markdown
 from .cpp_code import CppCode
 
 class MemberFunction:
+    __slots__ = ('_class_name', '_name', '_type', '_normalized_type',
+        '_args', '_const', '_overloading_index', '_anchor_id', '_brief',
+        '_detail', '_template_params')
+
     def __init__(self, class_name, name, type, args) -> None:
-        self._class_name = class_name
-        self._name = name
-        self._type = type
+        # Names and types repeat across the project.
+        self._class_name = sys.intern(class_name)
+        self._name = sys.intern(name)
+        self._type = sys.intern(type)
+        # Normalized once. Template brackets only.
+        self._normalized_type = self._type
+        if type.find('<') != -1:
+            self._normalized_type = sys.intern(
+                CppCode.normalize_template(type))
         self._args = args
         self._const = False
         self._overloading_index = 0
+        self._anchor_id = self._name.lower()
         self._brief = ''
         self._detail = ''
         self._template_params = [] # e.g. ['typename T', 'int num']
@@ -20,6 +33,9 @@ class MemberFunction:
 
     def set_overloading_index(self, index):
         self._overloading_index = index
+        self._anchor_id = self._name.lower()
+        if index > 0:
+            self._anchor_id += str(index)
 
     def set_brief(self, brief):
         self._brief = brief
@@ -44,10 +60,7 @@ class MemberFunction:
 
     @property
     def type(self) -> str:
-        t = self._type
-        if t.find('<') != -1:
-            return CppCode.normalize_template(t)
-        return t
+        return self._normalized_type
 
     @property
     def overloading_index(self):
@@ -55,11 +68,7 @@ class MemberFunction:
 
     @property
     def anchor_id(self):
-        anchor = self._name.lower()
-        if self._overloading_index > 0:
-            anchor += str(self._overloading_index)
-
-        return anchor
+        return self._anchor_id
 
     @property
     def brief(self):
@@ -69,35 +78,53 @@ class MemberFunction:
     def detail(self):
         return self._detail
 
-    def table_row(self):
+    def table_row(self, linker=None):
+        '''Row of the member functions table. The types are linked if a
+        `TypeLinker` is given.'''
         col1 = self.type
-        col2 = Markdown.link(self._name, f'#{self.anchor_id}')
+        args = ', '.join(self._args)
+        if linker is not None:
+            col1 = linker.link_code(col1, self._class_name)
+            args = linker.link_code(args, self._class_name)
+        col2 = Markdown.link(self._name, f'#{self._anchor_id}')
         col2 += '('
-        col2 += ', '.join(self._args)
+        col2 += args
         col2 += ')'
         if self._const is True:
             col2 += ' const'
 
         return f'| {col1} | {col2} |\n'
 
-    def heading(self, compatible_mode=True):
-        text = f'{self.type} {self._class_name}::{self._name}('
-        text += ', '.join(self._args)
+    def heading(self, compatible_mode=True, linker=None):
+        ret_type = self.type
+        args = ', '.join(self._args)
+        if linker is not None:
+            # Raw HTML headings need HTML links.
+            ret_type = linker.link_code(ret_type, self._class_name,
+                compatible_mode)
+            args = linker.link_code(args, self._class_name, compatible_mode)
+        text = f'{ret_type} {self._class_name}::{self._name}('
+        text += args
         text += ')'
         if self._const is True:
             text += ' const'
 
         ret = ''
         if compatible_mode is True:
-            ret = f'<h3 id="{self.anchor_id}">{text}</h3>'
+            ret = f'<h3 id="{self._anchor_id}">{text}</h3>'
         else:
             ret = f'### {text} {{#{self._anchor_id}}}'
 
         return ret
 
-    def description(self):
-        text = self.brief + '\n\n'
-        text += self.detail + '\n'
+    def description(self, linker=None):
+        brief = self.brief
+        detail = self.detail
+        if linker is not None:
+            brief = linker.link_text(brief, self._class_name)
+            detail = linker.link_text(detail, self._class_name)
+        text = brief + '\n\n'
+        text += detail + '\n'
 
         return text
 
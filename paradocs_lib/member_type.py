@@ -1,12 +1,21 @@
+import io
+import sys
+
 from .markdown import Markdown
 
 class MemberType:
     KIND_ALIAS = 0
     KIND_ENUM = 1
+    __slots__ = ('_class_name', '_name', '_kind', '_full_name', '_anchor_id',
+        '_brief', '_detail', '_type', '_enum_values')
+
     def __init__(self, class_name, name, kind) -> None:
-        self._class_name = class_name
-        self._name = name
+        self._class_name = sys.intern(class_name)
+        self._name = sys.intern(name)
         self._kind = kind
+        # Derived values. The names never change.
+        self._full_name = sys.intern(f'{class_name}::{name}')
+        self._anchor_id = f'enum-{name.lower()}'
         self._brief = ''
         self._detail = ''
 
@@ -26,7 +35,7 @@ class MemberType:
     @property
     def full_name(self) -> str:
         '''Fully qualified name of the type. Namespace is not included.'''
-        return self.class_name + '::' + self.name
+        return self._full_name
 
     @property
     def kind(self):
@@ -42,24 +51,29 @@ class MemberType:
     @property
     def anchor_id(self):
         '''Only for KIND_ENUM.'''
-        return f'enum-{self.name.lower()}'
+        return self._anchor_id
+
+    @property
+    def enum_values(self) -> list:
+        '''Only for KIND_ENUM. [{"name": str, "brief": str, "detail": str}]'''
+        return self._enum_values
 
     @property
     def brief(self) -> str:
-        return self._brief.strip()
+        return self._brief
 
     @property
     def detail(self) -> str:
-        return self._detail.strip()
+        return self._detail
 
     def set_brief(self, brief: str):
-        self._brief = brief
+        self._brief = brief.strip()
 
     def set_detail(self, detail: str):
-        self._detail = detail
+        self._detail = detail.strip()
 
     def set_type(self, alias_type):
-        self._type = alias_type
+        self._type = sys.intern(alias_type)
 
     def set_enum_values(self, enum_values):
         self._enum_values = enum_values
@@ -69,26 +83,38 @@ class MemberType:
         if self.kind == MemberType.KIND_ALIAS:
             return ''
         if compatible_mode == True:
-            return f'<h3 id="{self.anchor_id}">{self.name}</h3>'
+            return f'<h3 id="{self._anchor_id}">{self._name}</h3>'
         else:
-            return f'### {self.name} {{#{self._anchor_id}}}'
+            return f'### {self._name} {{#{self._anchor_id}}}'
 
     def table(self):
         '''Markdown table for values of enum class.'''
+        out = io.StringIO()
+        self.write_table(out)
+        return out.getvalue()
+
+    def write_table(self, out):
+        '''Write `table()` to out.'''
         if self.kind == MemberType.KIND_ALIAS:
-            return ''
+            return
         head = ['Name', 'Description']
-        body = []
+        Markdown.write_table(out, head, self._enum_rows())
+
+    def _enum_rows(self):
         for enum_value in self._enum_values:
             name = enum_value['name']
             desc = enum_value['brief']
             if enum_value['detail'] != '':
                 desc += '<br />' + enum_value['detail']
-            body.append([name, desc])
-        return Markdown.table(head, body)
+            yield [name, desc]
 
-    def description(self):
+    def description(self, linker=None):
         '''Brief and detail descriptions for enum class.'''
-        text = self.brief + '\n\n'
-        text += self.detail + '\n'
+        brief = self.brief
+        detail = self.detail
+        if linker is not None:
+            brief = linker.link_text(brief, self._class_name)
+            detail = linker.link_text(detail, self._class_name)
+        text = brief + '\n\n'
+        text += detail + '\n'
         return text
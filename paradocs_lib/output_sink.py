@@ -0,0 +1,153 @@
+import io
+import os
+import sys
+import tarfile
+import time
+import zipfile
+
+from .page_writer import PageWriter
+
+
+class OutputSink:
+    '''Destination of the rendered pages.
+
+    write_page(filename, render) streams the page rendered by render(out)
+    to the destination and returns its hash. Sinks that are not
+    `concurrent` must be written from one process only; worker processes
+    render the pages with `render_page()` and the main process adds them
+    with `add_page()`.
+    '''
+    FORMAT_DIR = 'dir'
+    FORMAT_ZIP = 'zip'
+    FORMAT_TAR = 'tar'
+    FORMAT_TAR_GZ = 'tar.gz'
+    FORMATS = [FORMAT_DIR, FORMAT_ZIP, FORMAT_TAR, FORMAT_TAR_GZ]
+
+    # Pages can be written from worker processes.
+    concurrent = False
+
+    @staticmethod
+    def open(output_format: str, outdir: str, path: str | None=None):
+        '''Sink of the format. The archives are written to path, "-" for
+        stdout, or next to outdir with the suffix of the format.'''
+        if output_format == OutputSink.FORMAT_DIR:
+            return DirectorySink(outdir)
+        if path is None:
+            path = outdir.rstrip('/') + '.' + output_format
+        if path == '-':
+            stream = sys.stdout.buffer
+        else:
+            directory = os.path.dirname(path)
+            if directory != '':
+                os.makedirs(directory, exist_ok=True)
+            stream = open(path, 'wb')
+        if output_format == OutputSink.FORMAT_ZIP:
+            return ZipSink(stream, owned=path != '-')
+        if output_format == OutputSink.FORMAT_TAR:
+            return TarSink(stream, compress=False, owned=path != '-')
+        if output_format == OutputSink.FORMAT_TAR_GZ:
+            return TarSink(stream, compress=True, owned=path != '-')
+        raise ValueError(f'Unknown output format: {output_format}')
+
+    @staticmethod
+    def render_page(render) -> tuple:
+        '''(UTF-8 text, hash) of the page rendered by render(out).'''
+        buffer = io.StringIO()
+        writer = PageWriter(buffer)
+        render(writer)
+        return buffer.getvalue().encode('utf-8'), writer.hexdigest()
+
+    def write_page(self, filename: str, render) -> str:
+        data, page_hash = self.render_page(render)
+        self.add_page(filename, data)
+        return page_hash
+
+    def add_page(self, filename: str, data: bytes):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DirectorySink(OutputSink):
+    '''One file per page in the output directory. A file is replaced only
+    when rendering its page succeeded.'''
+    concurrent = True
+
+    def __init__(self, outdir: str):
+        self._outdir = outdir
+        os.makedirs(outdir, exist_ok=True)
+
+    def write_page(self, filename: str, render) -> str:
+        path = self._outdir + '/' + filename
+        tmp_path = path + '.tmp'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(tmp_path, 'w') as f:
+                writer = PageWriter(f)
+                render(writer)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return writer.hexdigest()
+
+    def add_page(self, filename: str, data: bytes):
+        path = self._outdir + '/' + filename
+        tmp_path = path + '.tmp'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class ZipSink(OutputSink):
+    '''All pages in one zip archive. The stream does not need to be
+    seekable.'''
+    def __init__(self, stream, owned=True):
+        self._stream = stream
+        self._owned = owned
+        self._zip = zipfile.ZipFile(stream, 'w',
+            compression=zipfile.ZIP_DEFLATED)
+
+    def add_page(self, filename: str, data: bytes):
+        self._zip.writestr(filename, data)
+
+    def close(self):
+        self._zip.close()
+        if self._owned:
+            self._stream.close()
+        else:
+            self._stream.flush()
+
+
+class TarSink(OutputSink):
+    '''All pages in one tar archive, optionally gzip compressed. The
+    archive is written as a stream, so it can be piped.'''
+    def __init__(self, stream, compress=False, owned=True):
+        self._stream = stream
+        self._owned = owned
+        self._mtime = int(time.time())
+        self._tar = tarfile.open(fileobj=stream,
+            mode='w|gz' if compress else 'w|')
+
+    def add_page(self, filename: str, data: bytes):
+        info = tarfile.TarInfo(filename)
+        info.size = len(data)
+        info.mtime = self._mtime
+        info.mode = 0o644
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self._tar.close()
+        if self._owned:
+            self._stream.close()
+        else:
+            self._stream.flush()
@@ -0,0 +1,86 @@
+import http.server
+import urllib.parse
+
+from .markdown import Markdown
+
+
+class PageServer:
+    '''Serves pages over HTTP, rendered on each request.
+
+    render(name) returns the Markdown of the page, or None if there is no
+    page of the name. The name is the path without basepath and suffix,
+    and "index" for the index page. e.g. "/unicodescalar.md" is
+    "unicodescalar". Paths ending with ".html" get the page converted to
+    HTML, with links to the HTML views.
+    '''
+    def __init__(self, render, basepath='/', host='127.0.0.1', port=8000):
+        self._render = render
+        self._basepath = basepath if basepath.endswith('/') else basepath + '/'
+        self._server = http.server.HTTPServer((host, port),
+            self._make_handler())
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{self._basepath}'
+
+    def page_name(self, path) -> tuple:
+        '''(name, html) of the request path.'''
+        path = urllib.parse.unquote(urllib.parse.urlsplit(path).path)
+        if path.startswith(self._basepath):
+            path = path[len(self._basepath):]
+        path = path.strip('/')
+        html = path.endswith('.html')
+        if html:
+            path = path[:-len('.html')]
+        elif path.endswith('.md'):
+            path = path[:-len('.md')]
+        return (path if path != '' else 'index', html)
+
+    def html_link(self, url) -> str:
+        '''Link of the HTML view for the page links.'''
+        if not url.startswith('/'):
+            return url
+        path, _, fragment = url.partition('#')
+        if path.strip('/') == self._basepath.strip('/'):
+            path = self._basepath + 'index'
+        url = path + '.html'
+        return url + '#' + fragment if fragment != '' else url
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                name, html = server.page_name(self.path)
+                try:
+                    text = server._render(name)
+                except Exception as e:
+                    self._send(500, 'text/plain', f'{type(e).__name__}: {e}\n')
+                    return
+                if text is None:
+                    self._send(404, 'text/plain', f'No page: {name}\n')
+                elif html:
+                    body = Markdown.to_html(text, server.html_link)
+                    self._send(200, 'text/html',
+                        '<!DOCTYPE html>\n<meta charset="utf-8">\n'
+                        f'<title>{name}</title>\n{body}')
+                else:
+                    self._send(200, 'text/markdown', text)
+
+            def _send(self, status, content_type, text):
+                data = text.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type',
+                    f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
@@ -0,0 +1,21 @@
+import hashlib
+
+
+class PageWriter:
+    '''Text stream for the renderers. Passes the chunks to the underlying
+    stream and hashes them, so a page is never held in memory as a whole.
+
+    If stream is None, the chunks are only hashed.
+    '''
+    def __init__(self, stream=None):
+        self._stream = stream
+        self._hash = hashlib.sha256()
+
+    def write(self, text: str):
+        if self._stream is not None:
+            self._stream.write(text)
+        self._hash.update(text.encode('utf-8'))
+
+    def hexdigest(self) -> str:
+        '''Same as `Manifest.hash_text()` of the whole text.'''
+        return self._hash.hexdigest()
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+
+class ParseCache:
+    '''On-disk cache of parsed classes.
+
+    Entries are keyed by the content hash of the XML file, the namespace and
+    the Paradocs version, and contain no paths, so the cache directory can be
+    moved or restored from a CI artifact. Access time is tracked with the
+    file modification time, and `prune()` removes the least recently used
+    entries above the size limit.
+    '''
+    # Increase when the pickled model classes or the values the parser
+    # stores in them change.
+    FORMAT = 5
+    SUFFIX = '.pickle'
+
+    def __init__(self, directory, version, max_size=256 * 1024 * 1024):
+        self._directory = directory
+        self._version = version
+        self._max_size = max_size
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def key(self, namespace, file_hash) -> str:
+        text = f'{ParseCache.FORMAT}\0{self._version}\0{namespace}\0{file_hash}'
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _path(self, key) -> str:
+        return os.path.join(self._directory, key[:2], key + ParseCache.SUFFIX)
+
+    def load(self, key):
+        '''Return the cached value, or None.'''
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Broken entry, e.g. an interrupted copy of the directory.
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return value
+
+    def store(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write and rename, so other processes never read a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+            suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+    def prune(self):
+        '''Remove the least recently used entries above the size limit.'''
+        entries = [] # [(mtime, size, path)]
+        total = 0
+        for dirpath, _, filenames in os.walk(self._directory):
+            for filename in filenames:
+                if not filename.endswith(ParseCache.SUFFIX):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self._max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,117 @@
+import contextlib
+import functools
+import json
+import time
+import tracemalloc
+
+
+class Profiler:
+    '''Collects timing and memory of the build.
+
+    - Stages: wall time, CPU time and peak traced memory of each pipeline
+      stage, measured with `stage()`.
+    - Functions: call count and total time of the functions wrapped by
+      `instrument()`. Their time is included in the stages.
+    - Classes: parse and render time of each class, measured with
+      `measure()`.
+    '''
+    def __init__(self):
+        self._stages = {} # {"name": {"wall": float, "cpu": float, "peak": int}}
+        self._functions = {} # {"label": [calls, seconds]}
+        self._classes = {} # {"Name": {"parse": float, "render": float}}
+        self._patches = [] # [(owner, attr, original)]
+
+    def start(self):
+        tracemalloc.start()
+
+    def stop(self):
+        for owner, attr, original in reversed(self._patches):
+            setattr(owner, attr, original)
+        self._patches = []
+        tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        tracemalloc.reset_peak()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self._stages[name] = {
+                'wall': time.perf_counter() - wall,
+                'cpu': time.process_time() - cpu,
+                'peak': tracemalloc.get_traced_memory()[1],
+            }
+
+    @contextlib.contextmanager
+    def measure(self, kind, class_name):
+        '''Add the time of the block to the kind ("parse" or "render") of
+        the class.'''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self._classes.setdefault(class_name,
+                {'parse': 0.0, 'render': 0.0})
+            entry[kind] += time.perf_counter() - start
+
+    def instrument(self, owner, attr, label=None):
+        '''Replace owner.attr with a wrapper counting its calls and time
+        until `stop()`.'''
+        original = owner.__dict__[attr]
+        is_static = isinstance(original, staticmethod)
+        func = original.__func__ if is_static else original
+        label = label or f'{owner.__name__}.{attr}'
+        counter = self._functions.setdefault(label, [0, 0.0])
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                counter[0] += 1
+                counter[1] += time.perf_counter() - start
+
+        setattr(owner, attr, staticmethod(wrapper) if is_static else wrapper)
+        self._patches.append((owner, attr, original))
+
+    def slowest_classes(self, count):
+        '''List of (name, parse, render) by total time, slowest first.'''
+        rows = [(name, t['parse'], t['render'])
+            for name, t in self._classes.items()]
+        rows.sort(key=lambda x: x[1] + x[2], reverse=True)
+        return rows[:count]
+
+    def to_dict(self) -> dict:
+        return {
+            'stages': self._stages,
+            'functions': {label: {'calls': calls, 'time': seconds}
+                for label, (calls, seconds) in self._functions.items()},
+            'classes': self._classes,
+        }
+
+    def save(self, path, extra=None):
+        data = dict(extra or {})
+        data.update(self.to_dict())
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def report(self, top=10) -> str:
+        '''Plain text tables of the stages, functions and slowest classes.'''
+        lines = []
+        lines.append(f'{"Stage":<24}{"Wall (s)":>10}{"CPU (s)":>10}{"Peak (MiB)":>12}')
+        for name, s in self._stages.items():
+            peak = s['peak'] / (1024 * 1024)
+            lines.append(f'{name:<24}{s["wall"]:>10.3f}{s["cpu"]:>10.3f}{peak:>12.1f}')
+        lines.append('')
+        lines.append(f'{"Function":<36}{"Calls":>10}{"Total (s)":>10}')
+        for label, (calls, seconds) in self._functions.items():
+            lines.append(f'{label:<36}{calls:>10}{seconds:>10.3f}')
+        lines.append('')
+        lines.append(f'{"Slowest classes":<36}{"Parse (s)":>10}{"Render (s)":>11}')
+        for name, parse, render in self.slowest_classes(top):
+            lines.append(f'{name:<36}{parse:>10.4f}{render:>11.4f}')
+
+        return '\n'.join(lines)
@@ -0,0 +1,157 @@
+import json
+import os
+import re
+
+from typing import Dict, List
+
+
+class SearchIndex:
+    '''Inverted index of the names and briefs of the classes, for searching
+    in the browser.
+
+    The index is split into shards by the first PREFIX_LENGTH characters
+    of the tokens, so that a query loads only the shards of its prefix.
+    "search/index.json" lists the shards. "search/<prefix>.json" is
+
+        {"entries": [[title, kind, url], ...],
+         "tokens": {"token": [entry index, ...], ...}}
+
+    The entries of each class are kept in the output directory, so that
+    only the classes whose page is rendered are read again.
+    '''
+    FILENAME = '.paradocs-search.json'
+    DIRECTORY = 'search'
+    PREFIX_LENGTH = 2
+
+    KIND_CLASS = 'class'
+    KIND_FUNCTION = 'function'
+    KIND_ENUM = 'enum'
+    KIND_ENUM_VALUE = 'enum value'
+
+    _WORD_RE = re.compile(r'[a-z0-9_]+')
+    # Shorter words of the briefs are not indexed.
+    MIN_WORD_LENGTH = 3
+
+    def __init__(self, outdir, version, project_hash):
+        self._outdir = outdir
+        self._version = version
+        self._project_hash = project_hash
+        # {"Name": {"inputs": str, "entries": [[title, kind, url, [token]]]}}
+        self._old_classes = {}
+        self._classes = {}
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self._outdir, SearchIndex.FILENAME)
+
+    def load(self):
+        '''Load the entries of the previous build if usable.'''
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != self._version:
+            return
+        if data.get('project') != self._project_hash:
+            return
+        self._old_classes = data.get('classes', {})
+
+    def save(self):
+        '''Save the entries of the last `finish()`.'''
+        data = {
+            'version': self._version,
+            'project': self._project_hash,
+            'classes': self._old_classes,
+        }
+        os.makedirs(self._outdir, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'), sort_keys=True)
+
+    @staticmethod
+    def tokens(name: str, brief: str='') -> List[str]:
+        '''Lowercased name, its parts and the words of the brief.'''
+        name = name.lower()
+        tokens = [name]
+        for part in name.split('::'):
+            if part not in tokens:
+                tokens.append(part)
+        for word in SearchIndex._WORD_RE.findall(brief.lower()):
+            if len(word) >= SearchIndex.MIN_WORD_LENGTH and \
+                    word not in tokens:
+                tokens.append(word)
+        return tokens
+
+    @staticmethod
+    def class_entries(klass, basepath: str) -> List[list]:
+        '''Entries of the class, its member functions, enums and enum
+        values. The class must be parsed.'''
+        url = basepath.rstrip('/') + '/' + klass.link
+        entries = [[klass.name, SearchIndex.KIND_CLASS, url,
+            SearchIndex.tokens(klass.name, klass.brief)]]
+        for func in klass.member_functions:
+            entries.append([f'{klass.name}::{func.name}',
+                SearchIndex.KIND_FUNCTION, f'{url}#{func.anchor_id}',
+                SearchIndex.tokens(func.name, func.brief)])
+        for enum in klass.member_enums():
+            enum_url = f'{url}#{enum.anchor_id}'
+            entries.append([enum.full_name, SearchIndex.KIND_ENUM, enum_url,
+                SearchIndex.tokens(enum.name, enum.brief)])
+            for value in enum.enum_values:
+                entries.append([f'{enum.full_name}::{value["name"]}',
+                    SearchIndex.KIND_ENUM_VALUE, enum_url,
+                    SearchIndex.tokens(value['name'], value['brief'])])
+        return entries
+
+    def entries(self, class_name, inputs_hash) -> List[list] | None:
+        '''Entries of the previous build, or None if the inputs changed.'''
+        entry = self._old_classes.get(class_name)
+        if entry is None or entry['inputs'] != inputs_hash:
+            return None
+        self._classes[class_name] = entry
+        return entry['entries']
+
+    def set_entries(self, class_name, inputs_hash, entries: List[list]):
+        self._classes[class_name] = {
+            'inputs': inputs_hash,
+            'entries': entries,
+        }
+
+    def finish(self, class_names: List[str]):
+        '''Keep the entries of the classes only, in order of the names.
+        Entries not set in this build are carried over.'''
+        classes = {}
+        for name in class_names:
+            entry = self._classes.get(name, self._old_classes.get(name))
+            if entry is not None:
+                classes[name] = entry
+        self._old_classes = classes
+        self._classes = {}
+
+    def shards(self) -> Dict[str, str]:
+        '''{"search/<prefix>.json": JSON text} of the shards and the list
+        of the shards. Call after `finish()`.'''
+        shards = {} # {"prefix": ([entry], {id(entry): index}, {token: []})}
+        for entry in self._old_classes.values():
+            for title, kind, url, tokens in entry['entries']:
+                row = [title, kind, url]
+                for token in tokens:
+                    prefix = token[:SearchIndex.PREFIX_LENGTH]
+                    rows, indices, postings = shards.setdefault(prefix,
+                        ([], {}, {}))
+                    index = indices.get(id(row))
+                    if index is None:
+                        index = indices[id(row)] = len(rows)
+                        rows.append(row)
+                    postings.setdefault(token, []).append(index)
+
+        files = {}
+        for prefix, (rows, _, postings) in sorted(shards.items()):
+            files[f'{SearchIndex.DIRECTORY}/{prefix}.json'] = json.dumps(
+                {'entries': rows, 'tokens': postings},
+                separators=(',', ':'), sort_keys=True)
+        files[f'{SearchIndex.DIRECTORY}/index.json'] = json.dumps(
+            {'prefix_length': SearchIndex.PREFIX_LENGTH,
+             'shards': sorted(shards)},
+            separators=(',', ':'))
+        return files
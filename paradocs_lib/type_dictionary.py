@@ -1,12 +1,32 @@
-from typing import List
+import sys
+
+from typing import Dict, List
 
 class TypeDictionary:
     class Type:
         KIND_ENUM = 'KIND_ENUM'
         KIND_CLASS = 'KIND_CLASS'
+        __slots__ = ('_name', '_kind', '_enclosing_class', '_relative_name',
+            '_link')
+
         def __init__(self, name: str, kind: str):
-            self._name = name
+            self._name = sys.intern(name)
             self._kind = kind
+            # Derived values. The name and the kind never change.
+            split = name.rsplit('::', 1)
+            self._enclosing_class = sys.intern(split[0]) if len(split) == 2 else ''
+            self._relative_name = sys.intern(split[-1])
+            self._link = self._make_link()
+
+        def _make_link(self) -> str:
+            if self._kind == self.KIND_CLASS:
+                link_name = self._name.lower().replace('::', '')
+                return f'/{link_name}'
+            else:
+                enclosing = self._enclosing_class.lower().replace('::', '')
+                anchor = f'enum-{self._relative_name.lower()}'
+                link = f'/{enclosing}#{anchor}'
+                return link
 
         @property
         def name(self) -> str:
@@ -20,50 +40,57 @@ class TypeDictionary:
         @property
         def enclosing_class(self):
             '''Enclosing class name if the type is nested type.'''
-            if self.name.find('::') == -1:
-                return ''
-            split = self.name.rsplit('::', 1)
-            return split[0]
+            return self._enclosing_class
 
         @property
         def relative_name(self) -> str:
-            split = self.name.split('::')
-            return split[-1]
+            return self._relative_name
 
         @property
         def link(self) -> str:
             '''Link to other page. Must prepend basepath when using.'''
-            if self.kind == self.KIND_CLASS:
-                link_name = self.name.lower().replace('::', '')
-                return f'/{link_name}'
-            else:
-                enclosing = self.enclosing_class.lower().replace('::', '')
-                anchor = f'enum-{self.relative_name.lower()}'
-                link = f'/{enclosing}#{anchor}'
-                return link
+            return self._link
 
     def __init__(self):
         self._types: List[TypeDictionary.Type] = []
+        # Indices of _types.
+        self._by_name: Dict[str, TypeDictionary.Type] = {}
+        self._by_relative_name: Dict[str, List[TypeDictionary.Type]] = {}
+        self._by_enclosing_class: Dict[str, List[TypeDictionary.Type]] = {}
 
     def add_type(self, type):
         self._types.append(type)
+        # The first one wins for the same full name.
+        self._by_name.setdefault(type.name, type)
+        self._by_relative_name.setdefault(type.relative_name, []).append(type)
+        self._by_enclosing_class.setdefault(type.enclosing_class, []).append(type)
+
+    def remove_type(self, full_type):
+        '''Remove the types of the fully qualified type name.'''
+        removed = [t for t in self._types if t.name == full_type]
+        if len(removed) == 0:
+            return
+        self._types = [t for t in self._types if t.name != full_type]
+        del self._by_name[full_type]
+        for t in removed:
+            self._by_relative_name[t.relative_name].remove(t)
+            self._by_enclosing_class[t.enclosing_class].remove(t)
+
+    def types(self):
+        '''List of the types in order of registration.'''
+        return list(self._types)
 
     def get_type(self, full_type):
         '''Get the type from fully qualified type name.'''
-        found = None
-        try:
-            found = next(filter(lambda x: x.name == full_type, self._types))
-        except StopIteration:
-            pass
-        return found
+        return self._by_name.get(full_type)
 
     def find_types(self, type):
         '''List of relative types.'''
-        l = []
-        for t in self._types:
-            if t.relative_name == type:
-                l.append(t)
-        return l
+        return list(self._by_relative_name.get(type, []))
+
+    def nested_types(self, enclosing_class):
+        '''List of the types directly nested in the enclosing class.'''
+        return list(self._by_enclosing_class.get(enclosing_class, []))
 
     def __str__(self):
         text = '{\n'
@@ -0,0 +1,253 @@
+import contextlib
+import html
+import re
+
+from .markdown import Markdown
+from .type_dictionary import TypeDictionary
+
+
+class TypeLinker:
+    '''Links the known types in code and descriptions.
+
+    The types of the dictionary are put in a trie of their "::" separated
+    parts. The text is scanned once by a regex of the known parts, so that
+    only the qualified names starting with one of them are looked up. Each
+    name is looked up in the trie from the scope outwards, as C++ does. The
+    longest known prefix of the name is linked.
+
+    Build once per project, after all types are registered.
+    '''
+    _NAME = re.compile(r'(?<![\w:])[A-Za-z_]\w*(?:::[A-Za-z_]\w*)*')
+    _WORD = re.compile(r'[A-Za-z_]\w*')
+    # ASCII characters other than word characters, to spaces. Faster than
+    # _WORD for ASCII text.
+    _SEPARATORS = str.maketrans({chr(c): ' ' for c in range(128)
+        if not (chr(c).isalnum() or chr(c) == '_')})
+    # Characters other than word characters that a name does not follow.
+    # e.g. "Foo::Bar", "/docs/Bar", "www.Bar.org", "a@Bar.org", "#Bar".
+    _BEFORE_NAME = frozenset('_:/.@#')
+    # Size of the memo of the looked up names. It is cleared when full.
+    LINKS_LIMIT = 65536
+
+    def __init__(self, type_dictionary: TypeDictionary, basepath='/',
+            namespace=''):
+        self._basepath = basepath.rstrip('/')
+        # Node: [Type or None, {"part": Node}]
+        self._root = [None, {}]
+        self._parts = set()
+        types = type_dictionary.types()
+        for t in types:
+            self._insert(t.name, t)
+        if namespace != '' and not self._insert_namespace(namespace):
+            for t in types:
+                self._insert(f'{namespace}::{t.name}', t)
+        self._scopes = {} # {"Scope": [Node]}
+        # Signatures repeat in the table and the headings. Only the names
+        # matched by the regex are kept.
+        # {("Scope", "Name"): ("Linked", "URL", "Type") or None}
+        self._links = {}
+        self._recorded: list | None = None
+        self._linked: set | None = None
+        # Code spans, URLs from their "://" on, and qualified names starting
+        # with a known part. A name in a scope starts with a part of any
+        # depth. The alternatives are kept at the top level without a
+        # lookbehind, so that the regex skips to their first characters;
+        # the characters around a name are checked by `_link()`. C++ code
+        # has no backticks.
+        self._pattern = None
+        if len(self._parts) > 0:
+            self._pattern = re.compile('|'.join([r'`[^`]*`', r'://\S*'] + [
+                alternative + r'(?!\w)(?:::[A-Za-z_]\w*)*'
+                for alternative in TypeLinker._alternatives(self._parts)]))
+
+    @staticmethod
+    def _alternatives(words) -> list:
+        '''Regexes matching the words, one for each first character. The
+        common prefixes are factored out, so a match does not try the words
+        one by one.'''
+        trie = {}
+        for word in words:
+            node = trie
+            for c in word:
+                node = node.setdefault(c, {})
+            node[''] = {}
+
+        def pattern(node):
+            alternatives = [re.escape(c) + pattern(child)
+                for c, child in sorted(node.items()) if c != '']
+            if len(alternatives) == 0:
+                return ''
+            if len(alternatives) == 1 and '' not in node:
+                return alternatives[0]
+            group = '(?:' + '|'.join(alternatives) + ')'
+            return group + '?' if '' in node else group
+
+        return [re.escape(c) + pattern(child)
+            for c, child in sorted(trie.items())]
+
+    def _insert(self, name, t):
+        node = self._root
+        for part in name.split('::'):
+            self._parts.add(part)
+            child = node[1].get(part)
+            if child is None:
+                child = node[1][part] = [None, {}]
+            node = child
+        # The first one wins for the same full name.
+        if node[0] is None:
+            node[0] = t
+
+    def _insert_namespace(self, namespace) -> bool:
+        '''Make the names qualified with the namespace resolve as the names
+        without it: the node of the namespace shares the children of the
+        root. False if a type is named like a part of the namespace.'''
+        parts = namespace.split('::')
+        node = self._root
+        for part in parts:
+            if part in node[1]:
+                return False
+            child = node[1][part] = [None, {}]
+            node = child
+        node[1] = self._root[1]
+        self._parts.update(parts)
+
+        return True
+
+    @contextlib.contextmanager
+    def recording(self, linked: set | None=None):
+        '''Collect the parts of the names looked up in the block, linked
+        or not. A type added or removed later changes the links only if
+        one of its parts is among them. The names are added when the block
+        exits. If linked is given, the full names of the linked types are
+        added to it.'''
+        names = set()
+        texts = []
+        self._recorded = texts
+        self._linked = linked
+        try:
+            yield names
+        finally:
+            self._recorded = None
+            self._linked = None
+            # One scan of all texts of the block.
+            text = '\n'.join(texts)
+            if text.isascii():
+                names.update(text.translate(TypeLinker._SEPARATORS).split())
+            else:
+                names.update(TypeLinker._WORD.findall(text))
+
+    def _scope_nodes(self, scope: str) -> list:
+        '''Trie nodes of the scope and its enclosing scopes, innermost
+        first. The root is the last.'''
+        nodes = self._scopes.get(scope)
+        if nodes is not None:
+            return nodes
+        nodes = []
+        parts = scope.split('::') if scope != '' else []
+        for i in range(len(parts), 0, -1):
+            node = self._root
+            for part in parts[:i]:
+                node = node[1].get(part)
+                if node is None:
+                    break
+            if node is not None:
+                nodes.append(node)
+        nodes.append(self._root)
+        self._scopes[scope] = nodes
+
+        return nodes
+
+    def _resolve(self, parts, scope: str):
+        '''(Type, number of parts) of the longest known prefix of the parts,
+        or (None, 0).'''
+        for node in self._scope_nodes(scope):
+            found = None
+            length = 0
+            for i, part in enumerate(parts):
+                node = node[1].get(part)
+                if node is None:
+                    break
+                if node[0] is not None:
+                    found = node[0]
+                    length = i + 1
+            if found is not None:
+                return found, length
+        return None, 0
+
+    def _url(self, t: TypeDictionary.Type) -> str:
+        return self._basepath + t.link
+
+    def link_code(self, code: str, scope: str='', html_links=False) -> str:
+        '''Link the types in the code. e.g. "const Foo&" to
+        "const [Foo](/foo)&". Types are looked up from the scope, the full
+        name of a class. If html_links is True, <a> tags are used.'''
+        if self._recorded is not None:
+            self._recorded.append(code)
+        return self._link(code, scope, html_links)
+
+    def link_text(self, text: str, scope: str='') -> str:
+        '''Link the types in a description. A code span of a type name is
+        linked as a whole. Other code spans are left as they are.'''
+        if self._recorded is not None:
+            self._recorded.append(text)
+        return self._link(text, scope)
+
+    def _lookup(self, name: str, scope: str):
+        '''(Linked prefix, URL, type name) of a name matched by the regex,
+        or None. A code span is linked as a whole or not at all.'''
+        if name[0] == '`':
+            match = TypeLinker._NAME.fullmatch(name[1:-1].strip())
+            if match is None:
+                return None
+            split = match.group().split('::')
+            if split[0] not in self._parts:
+                return None
+            t, length = self._resolve(split, scope)
+            if t is None or length != len(split):
+                return None
+            return name, self._url(t), t.name
+        split = name.split('::')
+        t, length = self._resolve(split, scope)
+        if t is None:
+            return None
+        return '::'.join(split[:length]), self._url(t), t.name
+
+    def _link(self, code: str, scope: str, html_links=False) -> str:
+        if self._pattern is None:
+            return code
+        parts = []
+        pos = 0
+        links = self._links
+        for match in self._pattern.finditer(code):
+            start = match.start()
+            name = match.group()
+            if name[0] == ':':
+                # A URL.
+                continue
+            if name[0] != '`' and (start > 0 and (code[start - 1].isalnum()
+                    or code[start - 1] in TypeLinker._BEFORE_NAME)
+                    or code[match.end():match.end() + 1] == '@'):
+                # Part of a longer word or name, a path or an address.
+                continue
+            key = (scope, name)
+            link = links.get(key, False)
+            if link is False:
+                if len(links) >= TypeLinker.LINKS_LIMIT:
+                    links.clear()
+                link = links[key] = self._lookup(name, scope)
+            if link is None:
+                continue
+            linked, url, type_name = link
+            if self._linked is not None:
+                self._linked.add(type_name)
+            parts.append(code[pos:start])
+            if html_links:
+                parts.append(f'<a href="{html.escape(url)}">{linked}</a>')
+            else:
+                parts.append(Markdown.link(linked, url))
+            pos = start + len(linked)
+        if len(parts) == 0:
+            return code
+        parts.append(code[pos:])
+
+        return ''.join(parts)
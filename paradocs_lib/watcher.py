@@ -0,0 +1,71 @@
+import os
+import time
+
+from typing import Dict, List, Set, Tuple
+
+
+class Watcher:
+    '''Polls files for changes of their modification time and size.
+
+    Watched are the given files, and the files with the suffix in the given
+    directories. Added and removed files are changes too.
+    '''
+    def __init__(self, files: List[str], directories: List[str],
+            suffix='.xml', interval=0.5, debounce=0.3):
+        self._files = files
+        self._directories = directories
+        self._suffix = suffix
+        self._interval = interval
+        self._debounce = debounce
+        self._stats = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        stats = {} # {"path": (mtime_ns, size)}
+        for path in self._files:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (st.st_mtime_ns, st.st_size)
+        for directory in self._directories:
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if not entry.name.endswith(self._suffix):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    stats[os.path.join(directory, entry.name)] = \
+                        (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def poll(self) -> Set[str]:
+        '''Paths changed since the last poll.'''
+        stats = self._snapshot()
+        changed = set()
+        for path, stat in stats.items():
+            if self._stats.get(path) != stat:
+                changed.add(path)
+        changed.update(path for path in self._stats if path not in stats)
+        self._stats = stats
+
+        return changed
+
+    def wait(self) -> Set[str]:
+        '''Block until files change. Changes following each other within
+        the debounce time are returned together.'''
+        changed = self.poll()
+        while len(changed) == 0:
+            time.sleep(self._interval)
+            changed = self.poll()
+        while True:
+            time.sleep(self._debounce)
+            more = self.poll()
+            if len(more) == 0:
+                return changed
+            changed |= more
@@ -0,0 +1,63 @@
+import xml.etree.ElementTree as ET
+
+from typing import List
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+
+class XmlBackend:
+    '''Parser of the Doxygen XML files.
+
+    `xml.etree.ElementTree` by default. lxml builds the tree faster, but
+    its elements are slower to walk from Python, so it is used only if
+    selected, or with AUTO if it is installed. Comments and processing
+    instructions are dropped by both, so the elements have the same
+    children and text.
+    '''
+    AUTO = 'auto'
+    LXML = 'lxml'
+    STDLIB = 'stdlib'
+    # Exceptions of a malformed file.
+    PARSE_ERRORS = (ET.ParseError,) if lxml_etree is None else \
+        (ET.ParseError, lxml_etree.XMLSyntaxError)
+
+    _name = STDLIB
+
+    @staticmethod
+    def available() -> List[str]:
+        if lxml_etree is None:
+            return [XmlBackend.STDLIB]
+        return [XmlBackend.LXML, XmlBackend.STDLIB]
+
+    @staticmethod
+    def use(name: str):
+        '''Select the backend. AUTO is lxml if installed.'''
+        if name == XmlBackend.AUTO:
+            name = XmlBackend.available()[0]
+        if name not in XmlBackend.available():
+            raise ValueError(f'XML backend not available: {name}')
+        XmlBackend._name = name
+
+    @staticmethod
+    def name() -> str:
+        return XmlBackend._name
+
+    @staticmethod
+    def parse(filename):
+        '''Root element of the file.'''
+        if XmlBackend._name == XmlBackend.LXML:
+            parser = lxml_etree.XMLParser(remove_comments=True,
+                remove_pis=True, huge_tree=True)
+            return lxml_etree.parse(filename, parser).getroot()
+        return ET.parse(filename).getroot()
+
+    @staticmethod
+    def iterparse(filename, events=('end',)):
+        '''Iterator of (event, element) like `ET.iterparse`.'''
+        if XmlBackend._name == XmlBackend.LXML:
+            return lxml_etree.iterparse(filename, events=events,
+                remove_comments=True, remove_pis=True, huge_tree=True)
+        return ET.iterparse(filename, events=events)
@@ -7,64 +7,72 @@ class Xml:
     @staticmethod
     def plain_text(tree: ET.Element):
         '''Extract plain text from the tag.'''
-        txt = tree.text or ''
-
-        for child in tree:
-            txt += Xml.plain_text(child)
-            txt += child.tail or ''
-
-        return txt
+        return ''.join(tree.itertext())
 
     @staticmethod
     def plain_text_exclude(tree: ET.Element, exclude):
-        '''Extract plain text from the tag exclude given tags.'''
-        text = tree.text or ''
+        '''Extract plain text from the tag exclude given tags. The text of
+        each tag is stripped.'''
+        return Xml.join_text(tree, exclude)
 
-        for child in tree:
-            if child.tag in exclude:
-                pass
+    @staticmethod
+    def join_text(tree: ET.Element, exclude=(), code_tag=None):
+        '''Text of the tag without the excluded tags, and the text of each
+        tag stripped. The plain text of code_tag tags is wrapped in
+        backticks. Iterative, so deep markup does not recurse. Slightly slower
+        than recursion on long, flat descriptions.'''
+        stack = [] # [(tag, children, [text parts])]
+        elem = tree
+        children = iter(tree)
+        parts = [tree.text or '']
+        while True:
+            for child in children:
+                if child.tag in exclude:
+                    parts.append(child.tail or '')
+                elif child.tag == code_tag:
+                    parts.append(f'`{Xml.plain_text(child)}`')
+                    parts.append(child.tail or '')
+                elif len(child) == 0:
+                    parts.append((child.text or '').strip())
+                    parts.append(child.tail or '')
+                else:
+                    stack.append((elem, children, parts))
+                    elem = child
+                    children = iter(child)
+                    parts = [child.text or '']
+                    break
             else:
-                text += Xml.plain_text_exclude(child, exclude)
-            text += child.tail or ''
-
-        return text.strip()
+                text = ''.join(parts).strip()
+                if len(stack) == 0:
+                    return text
+                tail = elem.tail or ''
+                elem, children, parts = stack.pop()
+                parts.append(text)
+                parts.append(tail)
 
     @staticmethod
     def find_tag(tree: ET.Element, name: str):
-        '''Return the tag with the given name. Recursive.'''
-        if tree.tag == name:
-            return tree
-        for child in tree:
-            found = Xml.find_tag(child, name)
-            if found is not None:
-                return found
-        return None
+        '''Return the first tag with the given name in document order,
+        including the tree itself.'''
+        return next(tree.iter(name), None)
 
     @staticmethod
     def find_tag_direct(tree: ET.Element, name: str):
         '''Return the child tag with the given name. NOT recursive.'''
-        l = list(filter(lambda x: x.tag == name, tree))
-        if len(l) == 0:
-            return None
-        return l[0]
+        for child in tree:
+            if child.tag == name:
+                return child
+        return None
 
     @staticmethod
     def filter_tags(tree: ET.Element, name: str, attribs=None):
         '''Return the list of the given name tag. Not recursive.'''
+        filtered = [x for x in tree if x.tag == name]
         if attribs is None:
-            return list(filter(lambda x: x.tag == name, tree))
+            return filtered
         else:
             ret = []
-            filtered = list(filter(lambda x: x.tag == name, tree))
             for key in attribs:
                 value = attribs[key]
-                has_attrib_tags = filter(
-                    lambda x: key in x.attrib.keys(),
-                    filtered
-                )
-                match_tags = filter(
-                    lambda x: x.attrib[key] == value,
-                    has_attrib_tags
-                )
-                ret += list(match_tags)
+                ret += [x for x in filtered if x.attrib.get(key) == value]
             return ret